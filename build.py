@@ -6,10 +6,18 @@ Builds the sandbox on Windows, macOS, and Linux
 
 import sys
 import os
+import json
+import argparse
+import functools
 import platform
 import subprocess
 import shutil
 
+PROBE_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "zencube", "build_probe.json")
+
+# Tool versions detected by earlier builds, keyed by tool name
+_probe_cache = {}
+
 def print_status(message):
     """Print status message"""
     print(f"▶ {message}")
@@ -22,80 +30,226 @@ def print_success(message):
     """Print success message"""
     print(f"✅ {message}")
 
-def check_cmake():
-    """Check if CMake is available"""
+def load_probe_cache(cache_file):
+    """Load tool versions recorded by a previous build"""
     try:
-        result = subprocess.run(["cmake", "--version"], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            version = result.stdout.split('\n')[0]
-            print_status(f"Found {version}")
-            return True
-    except FileNotFoundError:
+        with open(cache_file) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    if isinstance(data, dict):
+        _probe_cache.update(data)
+
+def save_probe_cache(cache_file):
+    """Persist detected tool versions for the next build"""
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = cache_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(_probe_cache, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
         pass
+
+def _tool_mtime(tool):
+    """Modification time of the executable that would run for tool"""
+    exe = shutil.which(tool)
+    if exe is None:
+        return None
+    try:
+        return os.stat(exe).st_mtime
+    except OSError:
+        return None
+
+def _first_line(argv):
+    """Run argv and return its exit code and the first line of its stdout"""
+    proc = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    line = proc.stdout.readline().decode('utf-8', 'replace').strip()
+    proc.stdout.close()
+    try:
+        proc.wait(timeout=1)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+    return proc.returncode, line
+
+def _probe(tool, command, label=None, ok_codes=(0,)):
+    """Return a description of tool, or None if it is unavailable.
+
+    A cached entry is reused as long as the executable has not changed
+    since it was recorded; otherwise the tool is run to detect it.
+    """
+    entry = _probe_cache.get(tool)
+    mtime = _tool_mtime(tool)
+    if entry and mtime is not None and entry.get("mtime") == mtime:
+        return entry.get("version")
+    
+    try:
+        returncode, first_line = _first_line(command)
+    except FileNotFoundError:
+        return None
+    if returncode not in ok_codes:
+        return None
+    
+    version = label or first_line
+    if mtime is not None:
+        _probe_cache[tool] = {"version": version, "mtime": mtime}
+    return version
+
+@functools.lru_cache(maxsize=None)
+def check_cmake():
+    """Check if CMake is available"""
+    version = _probe("cmake", ["cmake", "--version"])
+    if version:
+        print_status(f"Found {version}")
+        return True
     return False
 
+@functools.lru_cache(maxsize=None)
 def check_compiler():
     """Check if a suitable C compiler is available"""
     system = platform.system()
     
     if system == "Windows":
         # Check for MSVC or MinGW
-        try:
-            result = subprocess.run(["cl"], capture_output=True, text=True)
-            if result.returncode == 0 or result.returncode == 9009:  # MSVC
-                print_status("Found MSVC compiler")
-                return True
-        except FileNotFoundError:
-            pass
-        
-        try:
-            result = subprocess.run(["gcc", "--version"], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print_status("Found MinGW/GCC compiler")
-                return True
-        except FileNotFoundError:
-            pass
+        probes = [
+            ("cl", ["cl"], "MSVC compiler", (0, 9009)),
+            ("gcc", ["gcc", "--version"], "MinGW/GCC compiler", (0,)),
+        ]
     else:
         # Check for GCC or Clang
-        compilers = ["gcc", "clang"]
-        for compiler in compilers:
-            try:
-                result = subprocess.run([compiler, "--version"], 
-                                      capture_output=True, text=True)
-                if result.returncode == 0:
-                    version = result.stdout.split('\n')[0]
-                    print_status(f"Found {version}")
-                    return True
-            except FileNotFoundError:
-                continue
+        probes = [(compiler, [compiler, "--version"], None, (0,))
+                  for compiler in ["gcc", "clang"]]
+    
+    for tool, command, label, ok_codes in probes:
+        version = _probe(tool, command, label, ok_codes)
+        if version:
+            print_status(f"Found {version}")
+            return True
     
     return False
 
-def build_with_cmake(build_dir="build", config="Release"):
+def build_jobs():
+    """Number of parallel build jobs, honoring CMAKE_BUILD_PARALLEL_LEVEL"""
+    return os.environ.get("CMAKE_BUILD_PARALLEL_LEVEL") or str(os.cpu_count() or 1)
+
+def _detect_cache():
+    """Find a compiler cache launcher, preferring sccache over ccache"""
+    for name in ("sccache", "ccache"):
+        path = shutil.which(name)
+        if path:
+            return name, path
+    return None, None
+
+def newest_cmakelists_mtime(source_dir="."):
+    """Latest modification time of any CMakeLists.txt under source_dir"""
+    newest = 0.0
+    stack = [source_dir]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    # Skip VCS metadata and build trees
+                    if not entry.name.startswith(".") and \
+                       not os.path.exists(os.path.join(entry.path, "CMakeCache.txt")):
+                        stack.append(entry.path)
+                elif entry.name == "CMakeLists.txt":
+                    newest = max(newest, entry.stat().st_mtime)
+    return newest
+
+def cmake_generated_build_file(build_dir):
+    """Path of the build system CMake generated in build_dir, per its cache's generator"""
+    generator = ""
+    try:
+        with open(os.path.join(build_dir, "CMakeCache.txt"), errors="replace") as f:
+            for line in f:
+                if line.startswith("CMAKE_GENERATOR:INTERNAL="):
+                    generator = line.split("=", 1)[1].strip()
+                    break
+    except OSError:
+        return None
+    if generator.startswith("Ninja"):
+        return os.path.join(build_dir, "build.ninja")
+    if generator.endswith("Makefiles"):
+        return os.path.join(build_dir, "Makefile")
+    if generator.startswith("Visual Studio"):
+        return os.path.join(build_dir, "ALL_BUILD.vcxproj")
+    if generator == "Xcode":
+        return os.path.join(build_dir, "CMakeScripts")
+    return None
+
+def cmake_cache_is_fresh(build_dir):
+    """Check if configure can be skipped for build_dir
+    
+    The cache must be newer than every CMakeLists.txt, and the build system
+    generated from it must exist and be at least as new. A failed configure
+    still writes the cache but not the build system, so it never counts.
+    """
+    build_file = cmake_generated_build_file(build_dir)
+    if build_file is None:
+        return False
+    try:
+        cache_mtime = os.path.getmtime(os.path.join(build_dir, "CMakeCache.txt"))
+        build_file_mtime = os.path.getmtime(build_file)
+    except OSError:
+        return False
+    return build_file_mtime >= cache_mtime >= newest_cmakelists_mtime()
+
+def build_with_cmake(build_dir="build", config="Release", reconfigure=False):
     """Build using CMake"""
     system = platform.system()
     
-    print_status("Configuring CMake...")
-    if not os.path.exists(build_dir):
-        os.makedirs(build_dir)
-    
-    if system == "Windows":
-        cmake_cmd = ["cmake", "-B", build_dir, "-S", ".", "-DCMAKE_BUILD_TYPE=" + config]
+    cmake_cache = os.path.join(build_dir, "CMakeCache.txt")
+    if not reconfigure and cmake_cache_is_fresh(build_dir):
+        print_status("Reusing existing CMake cache")
     else:
-        cmake_cmd = ["cmake", "-B", build_dir, "-S", ".", "-DCMAKE_BUILD_TYPE=" + config]
+        print_status("Configuring CMake...")
+        if not os.path.exists(build_dir):
+            os.makedirs(build_dir)
     
-    result = subprocess.run(cmake_cmd)
-    if result.returncode != 0:
-        print_error("CMake configuration failed")
-        return False
+        if system == "Windows":
+            cmake_cmd = ["cmake", "-B", build_dir, "-S", ".", "-DCMAKE_BUILD_TYPE=" + config]
+        else:
+            cmake_cmd = ["cmake", "-B", build_dir, "-S", ".", "-DCMAKE_BUILD_TYPE=" + config]
+    
+        # The generator of an already configured build directory can't be changed
+        configured = os.path.exists(cmake_cache)
+        use_ninja = not configured and shutil.which("ninja") is not None
+        if use_ninja:
+            cmake_cmd += ["-G", "Ninja"]
+            print_status("Using Ninja generator")
+        elif not configured:
+            print_status("Using default CMake generator")
+    
+        cache_name, cache_path = _detect_cache()
+        if cache_path:
+            cmake_cmd += ["-DCMAKE_C_COMPILER_LAUNCHER=" + cache_path,
+                          "-DCMAKE_CXX_COMPILER_LAUNCHER=" + cache_path]
+            print_status(f"Using compiler cache: {cache_name}")
+    
+        # MSBuild only compiles files in parallel with /MP
+        if system == "Windows" and not use_ninja and shutil.which("cl"):
+            cmake_cmd += ["-DCMAKE_C_FLAGS=/MP", "-DCMAKE_CXX_FLAGS=/MP"]
+    
+        result = subprocess.run(cmake_cmd)
+        if result.returncode != 0:
+            # Drop the half-written cache so the next run configures from scratch
+            try:
+                os.remove(cmake_cache)
+            except OSError:
+                pass
+            print_error("CMake configuration failed")
+            return False
     
     print_status("Building project...")
     if system == "Windows":
-        build_cmd = ["cmake", "--build", build_dir, "--config", config]
+        build_cmd = ["cmake", "--build", build_dir, "--config", config, "--parallel", build_jobs()]
     else:
-        build_cmd = ["cmake", "--build", build_dir]
+        build_cmd = ["cmake", "--build", build_dir, "--parallel", build_jobs()]
     
     result = subprocess.run(build_cmd)
     if result.returncode != 0:
@@ -118,7 +272,7 @@ def build_with_cmake(build_dir="build", config="Release"):
 def build_with_make():
     """Build using Make (Unix systems only)"""
     print_status("Building with Make...")
-    result = subprocess.run(["make", "all"])
+    result = subprocess.run(["make", "-j", build_jobs(), "all"])
     if result.returncode != 0:
         print_error("Make build failed")
         return False
@@ -130,12 +284,23 @@ def build_with_make():
     return True
 
 def main():
+    parser = argparse.ArgumentParser(description="Build the ZenCube sandbox")
+    parser.add_argument("--cache-file", default=PROBE_CACHE_FILE,
+                        help="File used to remember detected tools between builds "
+                             "(pass an empty string to disable)")
+    parser.add_argument("--reconfigure", action="store_true",
+                        help="Run the CMake configure step even if the build cache is up to date")
+    args = parser.parse_args()
+    
     system = platform.system()
     print(f"╔═══════════════════════════════════════════════════════════════╗")
     print(f"║              ZenCube Build System                           ║")
     print(f"║              Platform: {system:<29} ║")
     print(f"╚═══════════════════════════════════════════════════════════════╝\n")
     
+    if args.cache_file:
+        load_probe_cache(args.cache_file)
+    
     # Check for CMake
     has_cmake = check_cmake()
     
@@ -168,9 +333,12 @@ def main():
         
         return 1
     
+    if args.cache_file:
+        save_probe_cache(args.cache_file)
+    
     # Build using CMake (preferred method)
     if has_cmake:
-        success = build_with_cmake()
+        success = build_with_cmake(reconfigure=args.reconfigure)
         if success:
             return 0
     
@@ -9,39 +9,124 @@ import sys
 import os
 import json
 import subprocess
-from code_analyzer import CodeAnalyzer
+from concurrent.futures import ProcessPoolExecutor
+from code_analyzer import CodeAnalyzer, SUPPORTED_EXTENSIONS
+
+# Per-process analyzer used by the bulk-analysis worker pool
+_worker_analyzer = None
+
+# Resolved sandbox paths, keyed by project directory, reused across invocations
+SANDBOX_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "zencube", "sandbox_path.json")
+
+def _is_executable(st):
+    """Check executability from an already-fetched stat result"""
+    return os.name == 'nt' or bool(st.st_mode & 0o111)
+
+def _load_sandbox_cache():
+    """Load the cached sandbox locations (empty if missing or unreadable)"""
+    try:
+        with open(SANDBOX_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_sandbox_cache(cache):
+    """Atomically persist the sandbox location cache (best-effort)"""
+    try:
+        os.makedirs(os.path.dirname(SANDBOX_CACHE_FILE), exist_ok=True)
+        tmp_path = f"{SANDBOX_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, SANDBOX_CACHE_FILE)
+    except OSError:
+        pass
 
 def find_sandbox():
     """Find sandbox executable"""
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    paths = [
-        os.path.join(script_dir, "sandbox"),
-        os.path.join(script_dir, "sandbox.exe"),
-        os.path.join(script_dir, "build", "sandbox"),
-        os.path.join(script_dir, "build", "Release", "sandbox.exe"),
-        "./sandbox",
-        "./sandbox.exe"
+    cwd = os.getcwd()
+    candidates = [
+        (script_dir, "sandbox"),
+        (script_dir, "sandbox.exe"),
+        (os.path.join(script_dir, "build"), "sandbox"),
+        (os.path.join(script_dir, "build", "Release"), "sandbox.exe"),
+        (cwd, "sandbox"),
+        (cwd, "sandbox.exe")
     ]
+    # Only locations under script_dir are cached; a cwd hit depends on where we run
+    script_paths = [os.path.join(directory, name) for directory, name in candidates[:4]]
     
-    for path in paths:
-        full_path = os.path.abspath(path)
-        if os.path.exists(full_path):
-            if os.name != 'nt':
-                if os.access(full_path, os.X_OK):
-                    return full_path
-            else:
-                return full_path
+    # Fast path: a previously resolved location that still exists, unless one
+    # ahead of it in the search order has been built since
+    cache = _load_sandbox_cache()
+    cached = cache.get(script_dir)
+    if cached in script_paths:
+        for path in script_paths[:script_paths.index(cached) + 1]:
+            try:
+                if not _is_executable(os.stat(path)):
+                    continue
+            except OSError:
+                continue
+            if path != cached:
+                cache[script_dir] = path
+                _save_sandbox_cache(cache)
+            return path
+    
+    # One directory listing per directory instead of a stat per candidate
+    listings = {}
+    for directory, name in candidates:
+        if directory not in listings:
+            try:
+                with os.scandir(directory) as it:
+                    listings[directory] = {entry.name: entry for entry in it}
+            except OSError:
+                listings[directory] = {}
+        entry = listings[directory].get(name)
+        if entry is None:
+            continue
+        try:
+            if _is_executable(entry.stat()):
+                if entry.path in script_paths:
+                    cache[script_dir] = entry.path
+                    _save_sandbox_cache(cache)
+                return entry.path
+        except OSError:
+            continue
     return None
 
-def analyze_command(args):
-    """Analyze code for vulnerabilities"""
-    analyzer = CodeAnalyzer()
-    result = analyzer.analyze_file(args.file)
-    
+def _worker_init(use_cache=False):
+    """Build one CodeAnalyzer per worker so its rule tables compile once"""
+    global _worker_analyzer
+    _worker_analyzer = CodeAnalyzer(use_cache=use_cache)
+
+def _worker_scan(path):
+    """Analyze a single file inside a pool worker"""
+    return path, _worker_analyzer.analyze_file(path)
+
+def collect_paths(paths):
+    """Expand directories into the supported source files they contain"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                        files.append(os.path.join(root, name))
+        else:
+            files.append(path)
+    return files
+
+def print_report(file_path, result):
+    """Print a human-readable analysis report for one file"""
     print(f"\n{'='*60}")
-    print(f"Code Analysis Report: {args.file}")
+    print(f"Code Analysis Report: {file_path}")
     print(f"{'='*60}\n")
     
+    if 'error' in result:
+        print(f"Error: {result['error']}")
+        return
+    
     print(f"Total Issues: {result['total_issues']}")
     print(f"  Critical: {result['critical']}")
     print(f"  High: {result['high']}")
@@ -62,11 +147,62 @@ def analyze_command(args):
             print(f"\n[{warn['severity']}] {warn['type']}")
             print(f"  Line {warn['line']}: {warn['message']}")
             print(f"  Code: {warn['code']}")
+
+def analyze_command(args):
+    """Analyze code for vulnerabilities"""
+    if args.paths:
+        return analyze_bulk(args)
+    if not args.file:
+        print("Error: a file or --paths is required", file=sys.stderr)
+        return 1
+    
+    analyzer = CodeAnalyzer()
+    result = analyzer.analyze_file(args.file)
+    print_report(args.file, result)
     
     if args.json:
         print("\n" + json.dumps(result, indent=2))
     
-    return 0 if result['total_issues'] == 0 else 1
+    # An unreadable or unsupported file is a failure, not a clean scan
+    return 0 if 'error' not in result and result['total_issues'] == 0 else 1
+
+def analyze_bulk(args):
+    """Analyze many files in parallel across CPU cores"""
+    files = collect_paths(args.paths)
+    if args.file:
+        files.insert(0, args.file)
+    if not files:
+        print("Error: no supported files found", file=sys.stderr)
+        return 1
+    
+    jobs = max(1, args.jobs or os.cpu_count() or 1)
+    # Same heuristic as multiprocessing.Pool.map: ~4 batches per worker keeps
+    # pickling per file low while leaving room to balance uneven files
+    chunksize = max(1, -(-len(files) // (jobs * 4)))
+    results = []
+    total_issues = 0
+    errors = 0
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_worker_init,
+                             initargs=(not args.no_cache,)) as executor:
+        for path, result in executor.map(_worker_scan, files, chunksize=chunksize):
+            results.append(result)
+            if 'error' in result:
+                errors += 1
+            else:
+                total_issues += result['total_issues']
+            if not args.json:
+                print_report(path, result)
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"\n{'='*60}")
+        print(f"Analyzed {len(files) - errors} files, {total_issues} issues found")
+        if errors:
+            print(f"Could not analyze {errors} files")
+        print(f"{'='*60}")
+    
+    return 0 if total_issues == 0 and errors == 0 else 1
 
 def run_command(args):
     """Run command in sandbox"""
@@ -86,46 +222,133 @@ def run_command(args):
     if args.file_size:
         cmd.append(f"--fsize={args.file_size}")
     
-    cmd.extend(args.command)
+    cmd.extend(args.cmd)
     
+    if args.exec_replace:
+        # Become the sandbox instead of waiting on it as a child
+        sys.stdout.flush()
+        try:
+            os.execvp(cmd[0], cmd)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    
+    # No preexec_fn, shell or output capture, so CPython can launch the
+    # sandbox with vfork/posix_spawn rather than a full fork()
     try:
-        result = subprocess.run(cmd, text=True)
+        result = subprocess.run(cmd)
         return result.returncode
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
 
-def monitor_command(args):
-    """Monitor a running process"""
-    import psutil
+def parse_stat_buffer(buf):
+    """Extract (state, utime, stime, num_threads, rss_pages) from /proc/<pid>/stat"""
+    # comm may contain spaces or parens, so split after the last ')'
+    fields = buf[buf.rindex(b')') + 2:].split()
+    return fields[0], int(fields[11]), int(fields[12]), int(fields[17]), int(fields[21])
+
+def _print_monitor_header(pids):
+    print(f"Monitoring process{'es' if len(pids) > 1 else ''} {', '.join(map(str, pids))}...")
+    print(f"{'PID':<10} {'Time':<10} {'CPU%':<10} {'Memory(MB)':<15} {'Threads':<10}")
+    print("-" * 60)
+
+def _monitor_procfs(pids):
+    """Sample processes from persistent /proc/<pid>/stat descriptors (Linux)"""
     import time
     
+    fds = {}
+    for pid in pids:
+        try:
+            fds[pid] = os.open(f"/proc/{pid}/stat", os.O_RDONLY)
+        except FileNotFoundError:
+            for fd in fds.values():
+                os.close(fd)
+            print(f"Error: Process {pid} not found", file=sys.stderr)
+            return 1
+    
+    clock_ticks = os.sysconf('SC_CLK_TCK')
+    page_mb = os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    
+    def sample(fd):
+        try:
+            state, utime, stime, threads, rss = parse_stat_buffer(os.pread(fd, 1024, 0))
+        except (OSError, ValueError, IndexError):
+            return None
+        if state in (b'Z', b'X'):
+            return None
+        return utime + stime, threads, rss
+    
+    _print_monitor_header(pids)
+    start_time = time.time()
+    previous = {pid: (sample(fd), start_time) for pid, fd in fds.items()}
+    
     try:
-        pid = int(args.pid)
-        proc = psutil.Process(pid)
-        
-        print(f"Monitoring process {pid}...")
-        print(f"{'Time':<10} {'CPU%':<10} {'Memory(MB)':<15} {'Threads':<10}")
-        print("-" * 50)
-        
-        start_time = time.time()
-        while proc.is_running():
-            cpu = proc.cpu_percent(interval=1)
-            mem = proc.memory_info().rss / 1024 / 1024
-            threads = proc.num_threads()
-            elapsed = time.time() - start_time
-            
-            print(f"{elapsed:<10.1f} {cpu:<10.1f} {mem:<15.2f} {threads:<10}")
+        while fds:
             time.sleep(1)
-        
-        print("\nProcess completed.")
-        return 0
-    except psutil.NoSuchProcess:
-        print(f"Error: Process {args.pid} not found", file=sys.stderr)
-        return 1
-    except ValueError:
-        print(f"Error: Invalid PID: {args.pid}", file=sys.stderr)
+            now = time.time()
+            for pid, fd in list(fds.items()):
+                current = sample(fd)
+                before, before_time = previous[pid]
+                if current is None or before is None:
+                    os.close(fds.pop(pid))
+                    print(f"\nProcess {pid} completed.")
+                    continue
+                ticks, threads, rss = current
+                cpu = (ticks - before[0]) / clock_ticks / (now - before_time) * 100
+                previous[pid] = (current, now)
+                print(f"{pid:<10} {now - start_time:<10.1f} {cpu:<10.1f} {rss * page_mb:<15.2f} {threads:<10}")
+    finally:
+        for fd in fds.values():
+            os.close(fd)
+    return 0
+
+def _monitor_psutil(pids):
+    """Sample processes through psutil (portable fallback)"""
+    import psutil
+    import time
+    
+    try:
+        procs = {pid: psutil.Process(pid) for pid in pids}
+    except psutil.NoSuchProcess as e:
+        print(f"Error: Process {e.pid} not found", file=sys.stderr)
         return 1
+    
+    _print_monitor_header(pids)
+    for proc in procs.values():
+        proc.cpu_percent(interval=None)
+    
+    start_time = time.time()
+    while procs:
+        time.sleep(1)
+        elapsed = time.time() - start_time
+        for pid, proc in list(procs.items()):
+            try:
+                if not proc.is_running():
+                    raise psutil.NoSuchProcess(pid)
+                cpu = proc.cpu_percent(interval=None)
+                mem = proc.memory_info().rss / 1024 / 1024
+                threads = proc.num_threads()
+            except psutil.NoSuchProcess:
+                del procs[pid]
+                print(f"\nProcess {pid} completed.")
+                continue
+            print(f"{pid:<10} {elapsed:<10.1f} {cpu:<10.1f} {mem:<15.2f} {threads:<10}")
+    return 0
+
+def monitor_command(args):
+    """Monitor one or more running processes"""
+    pids = []
+    for pid in args.pid:
+        try:
+            pids.append(int(pid))
+        except ValueError:
+            print(f"Error: Invalid PID: {pid}", file=sys.stderr)
+            return 1
+    
+    if sys.platform.startswith('linux') and os.path.isdir('/proc/self'):
+        return _monitor_procfs(pids)
+    return _monitor_psutil(pids)
 
 def main():
     parser = argparse.ArgumentParser(
@@ -134,8 +357,9 @@ def main():
         epilog="""
 Examples:
   %(prog)s analyze script.py
+  %(prog)s analyze --paths src/ lib/ -j 8
   %(prog)s run --cpu=5 python3 script.py
-  %(prog)s monitor 12345
+  %(prog)s monitor 12345 12346
         """
     )
     
@@ -143,8 +367,11 @@ Examples:
     
     # Analyze command
     analyze_parser = subparsers.add_parser('analyze', help='Analyze code for vulnerabilities')
-    analyze_parser.add_argument('file', help='File to analyze')
+    analyze_parser.add_argument('file', nargs='?', help='File to analyze')
+    analyze_parser.add_argument('--paths', nargs='+', metavar='PATH', help='Files or directories to analyze in bulk')
+    analyze_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Worker processes for bulk analysis')
     analyze_parser.add_argument('--json', action='store_true', help='Output as JSON')
+    analyze_parser.add_argument('--no-cache', action='store_true', help='With --paths, ignore and do not update cached results')
     
     # Run command
     run_parser = subparsers.add_parser('run', help='Run command in sandbox')
@@ -152,11 +379,13 @@ Examples:
     run_parser.add_argument('--memory', type=int, help='Memory limit (MB)')
     run_parser.add_argument('--processes', type=int, help='Process limit')
     run_parser.add_argument('--file-size', type=int, help='File size limit (MB)')
-    run_parser.add_argument('command', nargs=argparse.REMAINDER, help='Command to run')
+    run_parser.add_argument('--exec', dest='exec_replace', action='store_true',
+                            help='Replace this process with the sandbox instead of spawning it')
+    run_parser.add_argument('cmd', metavar='command', nargs=argparse.REMAINDER, help='Command to run')
     
     # Monitor command
-    monitor_parser = subparsers.add_parser('monitor', help='Monitor a running process')
-    monitor_parser.add_argument('pid', help='Process ID to monitor')
+    monitor_parser = subparsers.add_parser('monitor', help='Monitor running processes')
+    monitor_parser.add_argument('pid', nargs='+', help='Process ID(s) to monitor')
     
     args = parser.parse_args()
     
@@ -6,21 +6,183 @@ Analyzes code for common security vulnerabilities and issues
 
 import re
 import os
+import sys
 import json
+import hashlib
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
 from typing import List, Dict, Tuple
 from pathlib import Path
 
+# Optional: Hyperscan matches every rule of a language in a single pass
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Optional: NumPy finds newlines and maps offsets to lines in C
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# File extensions analyze_file() knows how to scan
+SUPPORTED_EXTENSIONS = ('.c', '.cpp', '.cc', '.cxx', '.py', '.java')
+
+# Bump when rules or report format change so cached results are not reused
+ANALYZER_VERSION = '2.0'
+# Reports by content hash, for CLI bulk runs over mostly unchanged trees;
+# other callers analyze files as they are edited and leave it off
+ANALYSIS_CACHE_DIR = Path.home() / '.cache' / 'zencube' / 'analyze'
+
+def _analyzer_stamp() -> str:
+    """Version tag for cached results; also changes whenever this module is edited"""
+    try:
+        st = os.stat(__file__)
+    except OSError:
+        return ANALYZER_VERSION
+    return f'{ANALYZER_VERSION}-{st.st_mtime_ns:x}-{st.st_size:x}'
+
+_ANALYZER_STAMP = _analyzer_stamp()
+
+def _single_line(pattern: bytes) -> bytes:
+    """Stop \\s in a per-line pattern from matching newlines in a whole-file scan"""
+    return pattern.replace(rb'\s', rb'[^\S\n]')
+
+_RuleSet = namedtuple('_RuleSet', ['regex', 'meta', 'sources', 'flags'])
+
+def _compile_rules(rules, flags=0):
+    """Fuse (pattern, *meta) rules into one regex with a named group per rule.
+
+    Each alternative is wrapped in a lookahead so overlapping matches of
+    different rules on the same line are all reported, as they were when
+    every pattern was searched separately.
+    """
+    patterns = [_single_line(rule[0]) for rule in rules]
+    alternation = b'|'.join(b'(?=(?P<r%d>%s))' % (i, pattern) for i, pattern in enumerate(patterns))
+    meta = {f'r{i}': rule[1:] for i, rule in enumerate(rules)}
+    sources = {f'r{i}': pattern for i, pattern in enumerate(patterns)}
+    return _RuleSet(re.compile(alternation, flags), meta, sources, flags)
+
+# Compiled once at import: one alternation per check, scanned over the whole file
+_BUFOVF = _compile_rules([
+    (rb'\bstrcpy\s*\(', 'HIGH', 'Use of strcpy() can cause buffer overflow. Use strncpy() or strcpy_s() instead.'),
+    (rb'\bstrcat\s*\(', 'HIGH', 'Use of strcat() can cause buffer overflow. Use strncat() instead.'),
+    (rb'\bsprintf\s*\(', 'MEDIUM', 'Use of sprintf() can cause buffer overflow. Use snprintf() instead.'),
+    (rb'\bgets\s*\(', 'CRITICAL', 'Use of gets() is dangerous. Use fgets() instead.'),
+])
+_UNSAFE = _compile_rules([
+    (rb'\bsystem\s*\(', 'HIGH', 'Use of system() can lead to command injection.'),
+    (rb'\bpopen\s*\(', 'MEDIUM', 'Use of popen() can be unsafe.'),
+])
+_FORMAT = _compile_rules([
+    (rb'\bprintf\s*\([^,)\n]+\w+[^,)\n]*\)',),
+])
+_FORMAT_SPEC = re.compile(rb'%[sdifx]')
+_INTOVF = _compile_rules([
+    (rb'\+\+|--|\+\s*[0-9]|\*\s*[0-9]',),
+])
+_CMDINJ = _compile_rules([
+    (rb'os\.system\s*\(', 'Python'),
+    (rb'subprocess\.call\s*\(', 'Python'),
+    (rb'Runtime\.getRuntime\(\)\.exec', 'Java'),
+    (rb'ProcessBuilder', 'Java'),
+], re.IGNORECASE)
+_EVALEXEC = _compile_rules([
+    (rb'\beval\s*\(|\bexec\s*\(',),
+])
+_SQLINJ = _compile_rules([
+    (rb'execute\s*\([^)\n]*\+',),
+    (rb'query\s*\([^)\n]*\+',),
+    (rb'SELECT.*\+.*FROM',),
+    (rb'INSERT.*\+.*INTO',),
+], re.IGNORECASE)
+_SECRETS = _compile_rules([
+    (rb'password\s*=\s*["\'][^"\'\n]+["\']', 'Hardcoded password'),
+    (rb'api_key\s*=\s*["\'][^"\'\n]+["\']', 'Hardcoded API key'),
+    (rb'secret\s*=\s*["\'][^"\'\n]+["\']', 'Hardcoded secret'),
+], re.IGNORECASE)
+# Every secret rule starts with one of these words (compared lowercased)
+_SECRET_KEYWORDS = (b'password', b'api_key', b'secret')
+_DESERIAL = _compile_rules([
+    (rb'pickle\.loads|yaml\.load|marshal\.loads',),
+])
+_XSS = _compile_rules([
+    (rb'response\.getWriter\(\)\.print|out\.print',),
+])
+
+# Rule sets scanned for each language (Hyperscan compiles one DB each)
+_LANGUAGE_RULES = {
+    'c': [_BUFOVF, _UNSAFE, _FORMAT, _INTOVF, _CMDINJ],
+    'python': [_EVALEXEC, _SQLINJ, _CMDINJ, _SECRETS, _DESERIAL],
+    'java': [_SQLINJ, _CMDINJ, _XSS],
+}
+
+def _fuse_rules(rulesets):
+    """Fuse several rule sets into one regex so a language is scanned in one pass.
+
+    Case-insensitive rule sets keep their flag through an inline (?i:...)
+    group. Returns the regex and a map from its group names to
+    (rule set regex, rule group name). As within one rule set, only the
+    first rule matching at a given offset is reported.
+    """
+    alternatives, targets = [], {}
+    for ruleset in rulesets:
+        for name, source in ruleset.sources.items():
+            if ruleset.flags & re.IGNORECASE:
+                source = b'(?i:%s)' % source
+            group = f'g{len(targets)}'
+            alternatives.append(b'(?=(?P<%s>%s))' % (group.encode(), source))
+            targets[group] = (ruleset.regex, name)
+    return re.compile(b'|'.join(alternatives)), targets
+
+# One fused regex per language; hardcoded secrets use a keyword prefilter instead
+_LANGUAGE_SCANS = {
+    language: _fuse_rules([ruleset for ruleset in rulesets if ruleset is not _SECRETS])
+    for language, rulesets in _LANGUAGE_RULES.items()
+}
+
+# Allocation/free and file-operation patterns for the stateful checks
+_ALLOC_FREE_RE = re.compile(_single_line(
+    rb'\b(?P<var>\w+)\s*=\s*(?:\([^)\n]+\))?\s*(?:malloc|calloc|realloc)\s*\('
+    rb'|\bfree\s*\(\s*(?P<free>\w+)'
+))
+# open() both checks and uses a file; the alternatives can never overlap
+_FILE_OP_RE = re.compile(_single_line(
+    rb'(?P<check>access|stat)\s*\(|(?P<open>open)\s*\(|(?P<use>read|write)\s*\('
+))
+# How many following lines a file use may trail its check by
+_RACE_WINDOW = 2
+
+# Hyperscan databases per language, compiled on first use
+_HS_DATABASES = {}
+
 class CodeAnalyzer:
-    def __init__(self):
+    def __init__(self, use_cache: bool = False):
+        self.use_cache = use_cache
         self.vulnerabilities = []
         self.warnings = []
         self.info = []
+        self._content = b''
+        self._newline_offsets = array('q', [-1])
+        self._vuln_rows = []
+        self._warn_rows = []
+        self._counts = {'CRITICAL': 0, 'HIGH': 0, 'MEDIUM': 0}
+        self._hits = {}
         
-    def analyze_file(self, file_path: str) -> Dict:
-        """Analyze a code file for vulnerabilities"""
+    def analyze_file(self, file_path: str, content: bytes = None) -> Dict:
+        """Analyze a code file for vulnerabilities
+
+        Pass content when the caller has already read the file, to avoid
+        reading it a second time.
+        """
         self.vulnerabilities = []
         self.warnings = []
         self.info = []
+        self._vuln_rows = []
+        self._warn_rows = []
+        self._counts = {'CRITICAL': 0, 'HIGH': 0, 'MEDIUM': 0}
         
         if not os.path.exists(file_path):
             return {"error": "File not found"}
@@ -28,316 +190,428 @@ class CodeAnalyzer:
         file_ext = os.path.splitext(file_path)[1].lower()
         
         if file_ext == '.c' or file_ext == '.cpp' or file_ext in ['.cc', '.cxx']:
-            return self._analyze_c_cpp(file_path)
+            analyze = self._analyze_c_cpp
         elif file_ext == '.py':
-            return self._analyze_python(file_path)
+            analyze = self._analyze_python
         elif file_ext == '.java':
-            return self._analyze_java(file_path)
+            analyze = self._analyze_java
         else:
             return {"error": f"Unsupported file type: {file_ext}"}
+        
+        if content is None:
+            content = self._read_source(file_path)
+        if not self.use_cache:
+            return analyze(file_path, content)
+        
+        cache_key = f'{hashlib.sha256(content).hexdigest()}-{file_ext[1:]}-{_ANALYZER_STAMP}'
+        result = self._load_cached(cache_key)
+        if result is not None:
+            result['file'] = file_path
+            self.vulnerabilities = result['vulnerabilities']
+            self.warnings = result['warnings']
+            return result
+        
+        result = analyze(file_path, content)
+        self._store_cached(cache_key, result)
+        return result
+    
+    def _load_cached(self, cache_key: str):
+        """Return a stored report for this content, if there is one"""
+        try:
+            with open(ANALYSIS_CACHE_DIR / f'{cache_key}.json') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
     
-    def _analyze_c_cpp(self, file_path: str) -> Dict:
+    def _store_cached(self, cache_key: str, result: Dict):
+        """Best-effort write of a report to the analysis cache"""
+        cache_file = ANALYSIS_CACHE_DIR / f'{cache_key}.json'
+        tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            ANALYSIS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'w') as f:
+                json.dump(result, f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+    
+    def _analyze_c_cpp(self, file_path: str, content: bytes) -> Dict:
         """Analyze C/C++ code"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            lines = content.split('\n')
+        self._index_lines(content)
+        self._prescan('c', content)
         
         # Check for buffer overflow vulnerabilities
-        self._check_buffer_overflow(content, lines)
+        self._check_buffer_overflow(content)
         
         # Check for memory leaks
-        self._check_memory_leaks(content, lines)
+        self._check_memory_leaks(content)
         
         # Check for unsafe functions
-        self._check_unsafe_functions(content, lines)
+        self._check_unsafe_functions(content)
         
         # Check for format string vulnerabilities
-        self._check_format_strings(content, lines)
+        self._check_format_strings(content)
         
         # Check for integer overflow
-        self._check_integer_overflow(content, lines)
+        self._check_integer_overflow(content)
         
         # Check for command injection
-        self._check_command_injection(content, lines)
+        self._check_command_injection(content)
         
         # Check for race conditions
-        self._check_race_conditions(content, lines)
+        self._check_race_conditions(content)
         
         return self._generate_report(file_path)
     
-    def _analyze_python(self, file_path: str) -> Dict:
+    def _analyze_python(self, file_path: str, content: bytes) -> Dict:
         """Analyze Python code"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            lines = content.split('\n')
+        self._index_lines(content)
+        self._prescan('python', content)
         
         # Check for eval/exec usage
-        self._check_eval_exec(content, lines)
+        self._check_eval_exec(content)
         
         # Check for SQL injection
-        self._check_sql_injection(content, lines)
+        self._check_sql_injection(content)
         
         # Check for command injection
-        self._check_command_injection(content, lines)
+        self._check_command_injection(content)
         
         # Check for hardcoded secrets
-        self._check_hardcoded_secrets(content, lines)
+        self._check_hardcoded_secrets(content)
         
         # Check for unsafe deserialization
-        self._check_unsafe_deserialization(content, lines)
+        self._check_unsafe_deserialization(content)
         
         return self._generate_report(file_path)
     
-    def _analyze_java(self, file_path: str) -> Dict:
+    def _analyze_java(self, file_path: str, content: bytes) -> Dict:
         """Analyze Java code"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            lines = content.split('\n')
+        self._index_lines(content)
+        self._prescan('java', content)
         
         # Check for SQL injection
-        self._check_sql_injection(content, lines)
+        self._check_sql_injection(content)
         
         # Check for command injection
-        self._check_command_injection(content, lines)
+        self._check_command_injection(content)
         
         # Check for XSS vulnerabilities
-        self._check_xss(content, lines)
+        self._check_xss(content)
         
         return self._generate_report(file_path)
     
-    def _check_buffer_overflow(self, content: str, lines: List[str]):
+    def _read_source(self, file_path: str) -> bytes:
+        """Read a source file as raw bytes"""
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            return os.read(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+    
+    def _index_lines(self, content: bytes):
+        """Record where each line of the source starts"""
+        self._content = content
+        if numpy is not None:
+            newlines = numpy.flatnonzero(numpy.frombuffer(content, dtype=numpy.uint8) == 0x0A)
+            self._newline_offsets = numpy.concatenate(([-1], newlines))
+        else:
+            self._newline_offsets = array('q', [-1])
+            self._newline_offsets.extend(m.start() for m in re.finditer(b'\n', content))
+    
+    def _line_number(self, offset: int) -> int:
+        """1-based line number of a byte offset"""
+        return bisect_right(self._newline_offsets, offset)
+    
+    def _line_numbers(self, offsets: List[int]) -> List[int]:
+        """1-based line numbers of many byte offsets at once"""
+        if numpy is not None:
+            return numpy.searchsorted(self._newline_offsets, offsets, side='right').tolist()
+        return [bisect_right(self._newline_offsets, offset) for offset in offsets]
+    
+    def _line(self, line_num: int) -> bytes:
+        """Slice one source line out of the file; lines are never split up front"""
+        start = self._newline_offsets[line_num - 1] + 1
+        if line_num < len(self._newline_offsets):
+            return self._content[start:self._newline_offsets[line_num]]
+        return self._content[start:]
+    
+    @staticmethod
+    def _code_text(line: bytes) -> str:
+        """Decode a matched source line for the report"""
+        return line.decode('utf-8', 'ignore').strip()
+    
+    def _add_vulnerability(self, kind: str, severity: str, line: int, message: str):
+        """Record a vulnerability as a flat row; dicts are built in _generate_report"""
+        self._vuln_rows.append((kind, severity, line, message))
+        if severity in self._counts:
+            self._counts[severity] += 1
+    
+    def _add_warning(self, kind: str, severity: str, line: int, message: str):
+        """Record a warning as a flat row; dicts are built in _generate_report"""
+        self._warn_rows.append((kind, severity, line, message))
+        # Only medium warnings count towards the report totals
+        if severity == 'MEDIUM':
+            self._counts['MEDIUM'] += 1
+    
+    def _hs_database(self, language: str):
+        """Compile (once) a Hyperscan database holding every rule of a language"""
+        if language not in _HS_DATABASES:
+            expressions, ids, flags, targets = [], [], [], []
+            for ruleset in _LANGUAGE_RULES[language]:
+                hs_flags = hyperscan.HS_FLAG_SOM_LEFTMOST
+                if ruleset.flags & re.IGNORECASE:
+                    hs_flags |= hyperscan.HS_FLAG_CASELESS
+                for name, source in ruleset.sources.items():
+                    ids.append(len(targets))
+                    expressions.append(source)
+                    flags.append(hs_flags)
+                    targets.append((ruleset.regex, name))
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            db.compile(expressions=expressions, ids=ids, elements=len(expressions), flags=flags)
+            _HS_DATABASES[language] = (db, targets)
+        return _HS_DATABASES[language]
+    
+    def _prescan(self, language: str, content: bytes):
+        """Match all rules of a language in one pass, with Hyperscan if available"""
+        self._hits = self._hs_prescan(language, content)
+        if self._hits is not None:
+            return
+        
+        regex, targets = _LANGUAGE_SCANS[language]
+        self._hits = {ruleset_regex: [] for ruleset_regex, _ in targets.values()}
+        matches = [(m.start(), m.lastgroup) for m in regex.finditer(content)]
+        line_nums = self._line_numbers([start for start, _ in matches])
+        for line_num, (_, group) in zip(line_nums, matches):
+            ruleset_regex, name = targets[group]
+            self._hits[ruleset_regex].append((line_num, name))
+    
+    def _hs_prescan(self, language: str, content: bytes):
+        """Collect per-rule-set hits with Hyperscan, or None if it is unavailable"""
+        if hyperscan is None:
+            return None
+        try:
+            db, targets = self._hs_database(language)
+        except hyperscan.error:
+            return None
+        
+        hits = {ruleset.regex: [] for ruleset in _LANGUAGE_RULES[language]}
+        
+        def on_match(rule_id, start, end, flags, context):
+            regex, name = targets[rule_id]
+            hits[regex].append((start, name))
+        
+        db.scan(content, match_event_handler=on_match)
+        result = {}
+        for regex, found in hits.items():
+            found.sort()
+            line_nums = self._line_numbers([start for start, _ in found])
+            result[regex] = [(line_num, name) for line_num, (_, name) in zip(line_nums, found)]
+        return result
+    
+    def _scan(self, ruleset, content: bytes):
+        """Yield (line_number, rule_meta) once per matching rule per line"""
+        if ruleset.regex in self._hits:
+            matches = self._hits[ruleset.regex]
+        else:
+            found = [(m.start(), m.lastgroup) for m in ruleset.regex.finditer(content)]
+            line_nums = self._line_numbers([start for start, _ in found])
+            matches = [(line_num, name) for line_num, (_, name) in zip(line_nums, found)]
+        seen = set()
+        for key in matches:
+            if key not in seen:
+                seen.add(key)
+                yield key[0], ruleset.meta[key[1]]
+    
+    def _keyword_lines(self, content: bytes, keywords) -> List[int]:
+        """Line numbers containing any of the (lowercase) keywords, case-insensitively"""
+        lowered = content.lower()
+        positions = []
+        for keyword in keywords:
+            pos = lowered.find(keyword)
+            while pos != -1:
+                positions.append(pos)
+                pos = lowered.find(keyword, pos + 1)
+        return sorted(set(self._line_numbers(positions)))
+    
+    def _scan_lines(self, ruleset, candidates: List[int]):
+        """Like _scan, but only run the rules over the candidate lines"""
+        for i in candidates:
+            seen = set()
+            for m in ruleset.regex.finditer(self._line(i)):
+                if m.lastgroup not in seen:
+                    seen.add(m.lastgroup)
+                    yield i, ruleset.meta[m.lastgroup]
+    
+    def _check_buffer_overflow(self, content: bytes):
         """Check for buffer overflow vulnerabilities"""
         # Check for unsafe string functions
-        unsafe_funcs = [
-            (r'\bstrcpy\s*\(', 'HIGH', 'Use of strcpy() can cause buffer overflow. Use strncpy() or strcpy_s() instead.'),
-            (r'\bstrcat\s*\(', 'HIGH', 'Use of strcat() can cause buffer overflow. Use strncat() instead.'),
-            (r'\bsprintf\s*\(', 'MEDIUM', 'Use of sprintf() can cause buffer overflow. Use snprintf() instead.'),
-            (r'\bgets\s*\(', 'CRITICAL', 'Use of gets() is dangerous. Use fgets() instead.'),
-        ]
-        
-        for pattern, severity, message in unsafe_funcs:
-            for i, line in enumerate(lines, 1):
-                if re.search(pattern, line):
-                    self.vulnerabilities.append({
-                        'type': 'Buffer Overflow',
-                        'severity': severity,
-                        'line': i,
-                        'message': message,
-                        'code': line.strip()
-                    })
-    
-    def _check_memory_leaks(self, content: str, lines: List[str]):
+        for i, (severity, message) in self._scan(_BUFOVF, content):
+            self._add_vulnerability('Buffer Overflow', severity, i, message)
+    
+    def _check_memory_leaks(self, content: bytes):
         """Check for potential memory leaks"""
         malloc_lines = {}
         free_lines = {}
         
-        for i, line in enumerate(lines, 1):
-            # Find malloc/calloc/realloc
-            if re.search(r'\bmalloc\s*\(|\bcalloc\s*\(|\brealloc\s*\(', line):
-                # Try to extract variable name
-                match = re.search(r'(\w+)\s*=\s*(?:\([^)]+\))?\s*(?:malloc|calloc|realloc)', line)
-                if match:
-                    var_name = match.group(1)
-                    malloc_lines[var_name] = i
-            
-            # Find free
-            if re.search(r'\bfree\s*\(', line):
-                match = re.search(r'free\s*\(\s*(\w+)', line)
-                if match:
-                    var_name = match.group(1)
-                    free_lines[var_name] = i
+        # One pass finds both allocations (with their variable) and frees
+        for m in _ALLOC_FREE_RE.finditer(content):
+            line_num = self._line_number(m.start())
+            if m.group('var'):
+                malloc_lines[m.group('var').decode('ascii')] = line_num
+            else:
+                free_lines[m.group('free').decode('ascii')] = line_num
         
         # Check for malloc without corresponding free
-        for var, line_num in malloc_lines.items():
-            if var not in free_lines:
-                self.warnings.append({
-                    'type': 'Potential Memory Leak',
-                    'severity': 'MEDIUM',
-                    'line': line_num,
-                    'message': f'Variable {var} allocated but may not be freed.',
-                    'code': lines[line_num - 1].strip()
-                })
-    
-    def _check_unsafe_functions(self, content: str, lines: List[str]):
+        leaked = malloc_lines.keys() - free_lines.keys()
+        for var in sorted(leaked, key=malloc_lines.get):
+            line_num = malloc_lines[var]
+            self._add_warning('Potential Memory Leak', 'MEDIUM', line_num, f'Variable {var} allocated but may not be freed.')
+    
+    def _check_unsafe_functions(self, content: bytes):
         """Check for unsafe function usage"""
-        unsafe = [
-            (r'\bsystem\s*\(', 'HIGH', 'Use of system() can lead to command injection.'),
-            (r'\bpopen\s*\(', 'MEDIUM', 'Use of popen() can be unsafe.'),
-        ]
-        
-        for pattern, severity, message in unsafe:
-            for i, line in enumerate(lines, 1):
-                if re.search(pattern, line):
-                    self.warnings.append({
-                        'type': 'Unsafe Function',
-                        'severity': severity,
-                        'line': i,
-                        'message': message,
-                        'code': line.strip()
-                    })
-    
-    def _check_format_strings(self, content: str, lines: List[str]):
+        for i, (severity, message) in self._scan(_UNSAFE, content):
+            self._add_warning('Unsafe Function', severity, i, message)
+    
+    def _check_format_strings(self, content: bytes):
         """Check for format string vulnerabilities"""
-        for i, line in enumerate(lines, 1):
+        for i, _ in self._scan(_FORMAT, content):
+            line = self._line(i)
             # Check printf with user input
-            if re.search(r'\bprintf\s*\([^,)]+\w+[^,)]*\)', line):
-                if re.search(r'%[sdifx]', line):
-                    self.vulnerabilities.append({
-                        'type': 'Format String Vulnerability',
-                        'severity': 'HIGH',
-                        'line': i,
-                        'message': 'Potential format string vulnerability. Validate user input.',
-                        'code': line.strip()
-                    })
-    
-    def _check_integer_overflow(self, content: str, lines: List[str]):
+            if _FORMAT_SPEC.search(line):
+                self._add_vulnerability('Format String Vulnerability', 'HIGH', i, 'Potential format string vulnerability. Validate user input.')
+    
+    def _check_integer_overflow(self, content: bytes):
         """Check for integer overflow"""
-        for i, line in enumerate(lines, 1):
+        for i, _ in self._scan(_INTOVF, content):
+            line = self._line(i)
             # Check for arithmetic without bounds checking
-            if re.search(r'\+\+|--|\+\s*[0-9]|\*\s*[0-9]', line):
-                if 'int' in line or 'long' in line:
-                    self.warnings.append({
-                        'type': 'Potential Integer Overflow',
-                        'severity': 'MEDIUM',
-                        'line': i,
-                        'message': 'Check for integer overflow in arithmetic operations.',
-                        'code': line.strip()
-                    })
-    
-    def _check_command_injection(self, content: str, lines: List[str]):
+            if b'int' in line or b'long' in line:
+                self._add_warning('Potential Integer Overflow', 'MEDIUM', i, 'Check for integer overflow in arithmetic operations.')
+    
+    def _check_command_injection(self, content: bytes):
         """Check for command injection vulnerabilities"""
-        dangerous_patterns = [
-            (r'os\.system\s*\(', 'Python'),
-            (r'subprocess\.call\s*\(', 'Python'),
-            (r'Runtime\.getRuntime\(\)\.exec', 'Java'),
-            (r'ProcessBuilder', 'Java'),
-        ]
-        
-        for pattern, lang in dangerous_patterns:
-            for i, line in enumerate(lines, 1):
-                if re.search(pattern, line, re.IGNORECASE):
-                    # Check if user input is used
-                    if 'input(' in line or 'argv' in line or 'args' in line:
-                        self.vulnerabilities.append({
-                            'type': 'Command Injection',
-                            'severity': 'CRITICAL',
-                            'line': i,
-                            'message': f'Potential command injection in {lang}. Validate and sanitize user input.',
-                            'code': line.strip()
-                        })
-    
-    def _check_eval_exec(self, content: str, lines: List[str]):
+        for i, (lang,) in self._scan(_CMDINJ, content):
+            line = self._line(i)
+            # Check if user input is used
+            if b'input(' in line or b'argv' in line or b'args' in line:
+                self._add_vulnerability('Command Injection', 'CRITICAL', i, f'Potential command injection in {lang}. Validate and sanitize user input.')
+    
+    def _check_eval_exec(self, content: bytes):
         """Check for eval/exec usage in Python"""
-        for i, line in enumerate(lines, 1):
-            if re.search(r'\beval\s*\(|\bexec\s*\(', line):
-                self.vulnerabilities.append({
-                    'type': 'Code Injection',
-                    'severity': 'CRITICAL',
-                    'line': i,
-                    'message': 'Use of eval() or exec() is dangerous. Avoid if possible.',
-                    'code': line.strip()
-                })
-    
-    def _check_sql_injection(self, content: str, lines: List[str]):
+        for i, _ in self._scan(_EVALEXEC, content):
+            self._add_vulnerability('Code Injection', 'CRITICAL', i, 'Use of eval() or exec() is dangerous. Avoid if possible.')
+    
+    def _check_sql_injection(self, content: bytes):
         """Check for SQL injection vulnerabilities"""
-        sql_patterns = [
-            r'execute\s*\([^)]*\+',
-            r'query\s*\([^)]*\+',
-            r'SELECT.*\+.*FROM',
-            r'INSERT.*\+.*INTO',
-        ]
-        
-        for pattern in sql_patterns:
-            for i, line in enumerate(lines, 1):
-                if re.search(pattern, line, re.IGNORECASE):
-                    self.vulnerabilities.append({
-                        'type': 'SQL Injection',
-                        'severity': 'CRITICAL',
-                        'line': i,
-                        'message': 'Potential SQL injection. Use parameterized queries.',
-                        'code': line.strip()
-                    })
-    
-    def _check_hardcoded_secrets(self, content: str, lines: List[str]):
+        for i, _ in self._scan(_SQLINJ, content):
+            self._add_vulnerability('SQL Injection', 'CRITICAL', i, 'Potential SQL injection. Use parameterized queries.')
+    
+    def _check_hardcoded_secrets(self, content: bytes):
         """Check for hardcoded secrets"""
-        secret_patterns = [
-            (r'password\s*=\s*["\'][^"\']+["\']', 'Hardcoded password'),
-            (r'api_key\s*=\s*["\'][^"\']+["\']', 'Hardcoded API key'),
-            (r'secret\s*=\s*["\'][^"\']+["\']', 'Hardcoded secret'),
-        ]
-        
-        for pattern, msg in secret_patterns:
-            for i, line in enumerate(lines, 1):
-                if re.search(pattern, line, re.IGNORECASE):
-                    self.vulnerabilities.append({
-                        'type': 'Hardcoded Secret',
-                        'severity': 'HIGH',
-                        'line': i,
-                        'message': msg + '. Use environment variables or secure storage.',
-                        'code': line.strip()
-                    })
-    
-    def _check_unsafe_deserialization(self, content: str, lines: List[str]):
+        if _SECRETS.regex in self._hits:
+            hits = self._scan(_SECRETS, content)
+        else:
+            hits = self._scan_lines(_SECRETS, self._keyword_lines(content, _SECRET_KEYWORDS))
+        for i, (msg,) in hits:
+            self._add_vulnerability('Hardcoded Secret', 'HIGH', i, msg + '. Use environment variables or secure storage.')
+    
+    def _check_unsafe_deserialization(self, content: bytes):
         """Check for unsafe deserialization"""
-        for i, line in enumerate(lines, 1):
-            if re.search(r'pickle\.loads|yaml\.load|marshal\.loads', line):
-                self.vulnerabilities.append({
-                    'type': 'Unsafe Deserialization',
-                    'severity': 'HIGH',
-                    'line': i,
-                    'message': 'Unsafe deserialization can lead to code execution.',
-                    'code': line.strip()
-                })
-    
-    def _check_race_conditions(self, content: str, lines: List[str]):
+        for i, _ in self._scan(_DESERIAL, content):
+            self._add_vulnerability('Unsafe Deserialization', 'HIGH', i, 'Unsafe deserialization can lead to code execution.')
+    
+    def _check_race_conditions(self, content: bytes):
         """Check for potential race conditions"""
-        for i, line in enumerate(lines, 1):
-            if re.search(r'access\s*\(|stat\s*\(|open\s*\(', line):
-                # Check if file operation is followed by another file operation
-                if i < len(lines) - 1:
-                    next_line = lines[i]
-                    if re.search(r'open\s*\(|read\s*\(|write\s*\(', next_line):
-                        self.warnings.append({
-                            'type': 'Potential Race Condition',
-                            'severity': 'MEDIUM',
-                            'line': i,
-                            'message': 'Potential race condition in file operations.',
-                            'code': line.strip()
-                        })
-    
-    def _check_xss(self, content: str, lines: List[str]):
+        check_lines = set()
+        use_lines = set()
+        for m in _FILE_OP_RE.finditer(content):
+            line_num = self._line_number(m.start())
+            if m.lastgroup != 'use':
+                check_lines.add(line_num)
+            if m.lastgroup != 'check':
+                use_lines.add(line_num)
+        
+        # Flag file checks followed closely by another file operation
+        for i in sorted(check_lines):
+            if any(i + delta in use_lines for delta in range(1, _RACE_WINDOW + 1)):
+                self._add_warning('Potential Race Condition', 'MEDIUM', i, 'Potential race condition in file operations.')
+    
+    def _check_xss(self, content: bytes):
         """Check for XSS vulnerabilities in Java"""
-        for i, line in enumerate(lines, 1):
-            if re.search(r'response\.getWriter\(\)\.print|out\.print', line):
-                if 'request.getParameter' in line or 'request.getAttribute' in line:
-                    self.vulnerabilities.append({
-                        'type': 'XSS Vulnerability',
-                        'severity': 'HIGH',
-                        'line': i,
-                        'message': 'Potential XSS. Sanitize user input before output.',
-                        'code': line.strip()
-                    })
+        for i, _ in self._scan(_XSS, content):
+            line = self._line(i)
+            if b'request.getParameter' in line or b'request.getAttribute' in line:
+                self._add_vulnerability('XSS Vulnerability', 'HIGH', i, 'Potential XSS. Sanitize user input before output.')
+    
+    def _materialize(self, rows) -> List[Dict]:
+        """Turn recorded finding rows into report entries"""
+        return [{
+            'type': kind,
+            'severity': severity,
+            'line': line,
+            'message': message,
+            'code': self._code_text(self._line(line))
+        } for kind, severity, line, message in rows]
     
     def _generate_report(self, file_path: str) -> Dict:
         """Generate analysis report"""
-        total_issues = len(self.vulnerabilities) + len(self.warnings)
-        critical = sum(1 for v in self.vulnerabilities if v['severity'] == 'CRITICAL')
-        high = sum(1 for v in self.vulnerabilities if v['severity'] == 'HIGH')
-        medium = sum(1 for v in self.vulnerabilities + self.warnings if v['severity'] == 'MEDIUM')
+        self.vulnerabilities = self._materialize(self._vuln_rows)
+        self.warnings = self._materialize(self._warn_rows)
+        total_issues = len(self._vuln_rows) + len(self._warn_rows)
         
         return {
             'file': file_path,
             'total_issues': total_issues,
-            'critical': critical,
-            'high': high,
-            'medium': medium,
+            'critical': self._counts['CRITICAL'],
+            'high': self._counts['HIGH'],
+            'medium': self._counts['MEDIUM'],
             'vulnerabilities': self.vulnerabilities,
             'warnings': self.warnings,
             'info': self.info
         }
 
+# Analyzer reused by every task a pool worker process runs
+_pool_analyzer = None
+
+def analyze_in_pool(file_path: str) -> Dict:
+    """Process-pool task: analyze one file with this worker's analyzer"""
+    global _pool_analyzer
+    if _pool_analyzer is None:
+        _pool_analyzer = CodeAnalyzer()
+    return _pool_analyzer.analyze_file(file_path)
+
+def _pool_warmup():
+    """No-op task that makes a pool start its workers ahead of real requests"""
+    return os.getpid()
+
+def start_analysis_pool(max_workers: int = None, mp_context=None):
+    """Start a persistent ProcessPoolExecutor for analyze_in_pool tasks.
+
+    Workers come from a forkserver that has only this module loaded (spawn
+    on Windows, the default method if forkserver is unavailable), so they don't inherit whatever the caller has imported,
+    e.g. Flask. Every worker is started before returning, so the first
+    request does not pay for process creation.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    if mp_context is None:
+        if sys.platform == 'win32':
+            mp_context = multiprocessing.get_context('spawn')
+        else:
+            try:
+                mp_context = multiprocessing.get_context('forkserver')
+                mp_context.set_forkserver_preload(['code_analyzer'])
+            except ValueError:
+                # e.g. under eventlet's monkey-patching; use the default
+                mp_context = None
+    workers = max_workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp_context)
+    for future in [pool.submit(_pool_warmup) for _ in range(workers)]:
+        future.result()
+    return pool
+
 def main():
-    import sys
     if len(sys.argv) < 2:
         print("Usage: code_analyzer.py <file_path>")
         sys.exit(1)
@@ -6,16 +6,52 @@ Run this file to start everything automatically
 
 import os
 import sys
-import subprocess
 import platform
-import time
-import argparse
-import webbrowser
+import shutil
+import functools
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Records the requirements.txt state that last passed the dependency check
+DEPS_MARKER_FILE = os.path.join(os.path.expanduser("~"), ".cache", "zencube", "deps_ok")
+
+# Fingerprint of the sandbox build inputs the current binary was built from
+SANDBOX_HASH_FILE = os.path.join("build", ".sandbox_hash")
+SANDBOX_SOURCE_DIRS = [".", "tests"]
+
+QUARANTINE_ATTR = "com.apple.quarantine"
+
+def _removexattr_libc(file_path):
+    """Remove the quarantine attribute with libc's removexattr (macOS).
+
+    Returns True if it was removed, False if it was not set. Raises
+    OSError/AttributeError when libc can't be used, so callers can fall back.
+    """
+    import ctypes
+    import errno
+    libc = ctypes.CDLL(None, use_errno=True)
+    removexattr = libc.removexattr
+    removexattr.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+    removexattr.restype = ctypes.c_int
+    if removexattr(os.fsencode(file_path), QUARANTINE_ATTR.encode(), 0) == 0:
+        return True
+    err = ctypes.get_errno()
+    if err == getattr(errno, "ENOATTR", 93):
+        return False
+    raise OSError(err, os.strerror(err), file_path)
 
 def remove_quarantine_if_needed(file_path):
     """Remove macOS quarantine attribute if present (on macOS only)"""
     if platform.system() != "Darwin":
         return
+    import subprocess
+    try:
+        # One syscall instead of spawning xattr -l / xattr -d
+        if _removexattr_libc(file_path):
+            print(f"🔓 Removed macOS quarantine from {file_path}")
+        return
+    except (OSError, AttributeError):
+        pass
     try:
         # Check if quarantine attribute exists
         result = subprocess.run(
@@ -24,10 +60,10 @@ def remove_quarantine_if_needed(file_path):
             text=True,
             timeout=5
         )
-        if "com.apple.quarantine" in result.stdout:
+        if QUARANTINE_ATTR in result.stdout:
             # Remove quarantine attribute
             subprocess.run(
-                ["xattr", "-d", "com.apple.quarantine", file_path],
+                ["xattr", "-d", QUARANTINE_ATTR, file_path],
                 capture_output=True,
                 timeout=5
             )
@@ -36,69 +72,226 @@ def remove_quarantine_if_needed(file_path):
         # Silently fail if xattr doesn't exist or can't remove
         pass
 
+def _deps_key():
+    """Identify the interpreter and requirements.txt the check ran against"""
+    try:
+        st = os.stat("requirements.txt")
+    except OSError:
+        return None
+    return f"{sys.executable}:{st.st_mtime_ns}:{st.st_size}"
+
+def _mark_deps_ok(key):
+    """Remember that dependencies are installed (best-effort)"""
+    if key is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(DEPS_MARKER_FILE), exist_ok=True)
+        tmp_file = DEPS_MARKER_FILE + ".tmp"
+        with open(tmp_file, "w") as f:
+            f.write(key)
+        os.replace(tmp_file, DEPS_MARKER_FILE)
+    except OSError:
+        pass
+
+def _install_command():
+    """Installer command for requirements.txt: uv if available, else pip.
+
+    A populated ./wheels directory is used as the only package source, which
+    skips index lookups entirely.
+    """
+    uv = shutil.which("uv")
+    if uv:
+        cmd = [uv, "pip", "install", "--python", sys.executable]
+    else:
+        cmd = [sys.executable, "-m", "pip", "install", "--disable-pip-version-check"]
+    if os.path.isdir("wheels") and any(name.endswith(".whl") for name in os.listdir("wheels")):
+        cmd += ["--no-index", "--find-links", "wheels"]
+    return cmd + ["-r", "requirements.txt"]
+
+def install_requirements():
+    """Install requirements.txt, echoing the installer's progress line by line"""
+    import subprocess
+    cmd = _install_command()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, bufsize=1)
+    # Prefix the output so it stays readable next to the concurrent sandbox build
+    for line in proc.stdout:
+        print(f"   pip: {line.rstrip()}", flush=True)
+    proc.stdout.close()
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
 def check_and_install_dependencies():
     """Check and install Python dependencies"""
+    import subprocess
     print("📦 Checking dependencies...")
+    key = _deps_key()
+    if key is not None:
+        try:
+            with open(DEPS_MARKER_FILE) as f:
+                if f.read() == key:
+                    print("✅ All dependencies installed")
+                    return True
+        except OSError:
+            pass
+    
     try:
         import flask
         import flask_socketio
         import psutil
         print("✅ All dependencies installed")
+        _mark_deps_ok(key)
         return True
     except ImportError as e:
         print(f"⚠️  Missing dependency: {e.name}")
         print("📥 Installing dependencies...")
         try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+            install_requirements()
             print("✅ Dependencies installed successfully")
+            _mark_deps_ok(key)
             return True
         except subprocess.CalledProcessError:
             print("❌ Failed to install dependencies")
             print("Please run manually: pip3 install -r requirements.txt")
             return False
 
+def _sandbox_inputs_hash():
+    """Hash the name, mtime and size of every file the sandbox build reads"""
+    entries = []
+    for source_dir in SANDBOX_SOURCE_DIRS:
+        try:
+            with os.scandir(source_dir) as it:
+                for entry in it:
+                    if entry.name in ("Makefile", "CMakeLists.txt") or entry.name.endswith((".c", ".h")):
+                        st = entry.stat()
+                        entries.append(f"{entry.path}:{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            continue
+    digest = hashlib.blake2b(digest_size=16)
+    for line in sorted(entries):
+        digest.update(line.encode() + b"\n")
+    return digest.hexdigest()
+
+def _read_sandbox_hash():
+    """Fingerprint recorded by the last successful build, if any"""
+    try:
+        with open(SANDBOX_HASH_FILE) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _write_sandbox_hash(digest):
+    """Record the inputs the sandbox binary matches (best-effort)"""
+    try:
+        os.makedirs(os.path.dirname(SANDBOX_HASH_FILE), exist_ok=True)
+        with open(SANDBOX_HASH_FILE, "w") as f:
+            f.write(digest)
+    except OSError:
+        pass
+
+BUILD_IDLE_TIMEOUT = 30
+
+def _run_build_step(cmd, idle_timeout=BUILD_IDLE_TIMEOUT):
+    """Run a build command, echoing its output line by line.
+
+    The command is killed only after idle_timeout seconds without output,
+    so long but progressing builds are never cut off. Returns the exit code;
+    raises subprocess.TimeoutExpired if the command was killed for idling.
+    """
+    import subprocess
+    import threading
+    import time
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, bufsize=1, errors="replace")
+    last_output = time.monotonic()
+    idled = threading.Event()
+
+    def watchdog():
+        # Reading the pipe blocks, so idleness is checked from a separate thread
+        while proc.poll() is None:
+            if time.monotonic() - last_output > idle_timeout:
+                idled.set()
+                proc.kill()
+                return
+            time.sleep(1)
+
+    threading.Thread(target=watchdog, daemon=True).start()
+    # Prefix the output so it stays readable next to the concurrent pip install
+    for line in proc.stdout:
+        last_output = time.monotonic()
+        print(f"   build: {line.rstrip()}", flush=True)
+    proc.stdout.close()
+    returncode = proc.wait()
+    if idled.is_set():
+        raise subprocess.TimeoutExpired(cmd, idle_timeout)
+    return returncode
+
+@functools.lru_cache(maxsize=1)
 def check_and_build_sandbox():
-    """Check and build sandbox if needed"""
+    """Check and build sandbox if needed (at most once per process)"""
+    import subprocess
     sandbox_paths = [
         "./sandbox",
         "./build/sandbox",
         "./build/Release/sandbox.exe"
     ]
     
-    for path in sandbox_paths:
-        if os.path.exists(path):
-            remove_quarantine_if_needed(path)
-            print(f"✅ Sandbox found: {path}")
-            return True
+    existing = next((path for path in sandbox_paths if os.path.exists(path)), None)
+    digest = _sandbox_inputs_hash()
+    recorded = _read_sandbox_hash()
+    
+    # A binary with no recorded inputs (e.g. shipped prebuilt) is trusted as-is
+    if existing and recorded in (None, digest):
+        if recorded is None:
+            _write_sandbox_hash(digest)
+        remove_quarantine_if_needed(existing)
+        print(f"✅ Sandbox found: {existing}")
+        return True
     
     print("🔨 Building sandbox...")
+    build_jobs = str(os.cpu_count() or 1)
     try:
         # Try Make first
-        result = subprocess.run(["make", "sandbox"], capture_output=True, text=True, timeout=60)
-        if result.returncode == 0 and os.path.exists("./sandbox"):
+        returncode = _run_build_step(["make", "-j", build_jobs, "sandbox"])
+        if returncode == 0 and os.path.exists("./sandbox"):
             remove_quarantine_if_needed("./sandbox")
+            _write_sandbox_hash(digest)
             print("✅ Sandbox built successfully")
             return True
     except (subprocess.TimeoutExpired, FileNotFoundError):
         pass
     
     try:
-        # Try CMake
-        if not os.path.exists("build"):
-            subprocess.run(["cmake", "-B", "build", "-DCMAKE_BUILD_TYPE=Release"], 
-                         capture_output=True, timeout=60)
-        subprocess.run(["cmake", "--build", "build"], capture_output=True, timeout=60)
-        if os.path.exists("./build/sandbox"):
-            remove_quarantine_if_needed("./build/sandbox")
-            print("✅ Sandbox built successfully")
-            return True
-        if os.path.exists("./build/Release/sandbox.exe"):
-            remove_quarantine_if_needed("./build/Release/sandbox.exe")
-            print("✅ Sandbox built successfully")
-            return True
+        # Try CMake; configure unless build.py would reuse the build directory
+        from build import cmake_cache_is_fresh
+        returncode = 0
+        if not cmake_cache_is_fresh("build"):
+            cmake_cache = os.path.join("build", "CMakeCache.txt")
+            configure_cmd = ["cmake", "-B", "build", "-DCMAKE_BUILD_TYPE=Release"]
+            # The generator of an already configured build directory can't be changed
+            if not os.path.exists(cmake_cache) and shutil.which("ninja"):
+                configure_cmd += ["-G", "Ninja"]
+            returncode = _run_build_step(configure_cmd)
+            if returncode != 0 and os.path.exists(cmake_cache):
+                # Don't leave a half-written cache for the next launch to trust
+                os.remove(cmake_cache)
+        if returncode == 0:
+            returncode = _run_build_step(["cmake", "--build", "build", "--parallel", build_jobs])
+        for path in ("./build/sandbox", "./build/Release/sandbox.exe"):
+            if returncode == 0 and os.path.exists(path):
+                remove_quarantine_if_needed(path)
+                _write_sandbox_hash(digest)
+                print("✅ Sandbox built successfully")
+                return True
     except (subprocess.TimeoutExpired, FileNotFoundError):
         pass
     
+    if existing:
+        # Sources changed but the rebuild failed; the old binary still works
+        remove_quarantine_if_needed(existing)
+        print(f"⚠️  Could not rebuild sandbox, using existing: {existing}")
+        return True
+    
     print("⚠️  Could not build sandbox automatically")
     print("Please build manually: make  or  cmake -B build && cmake --build build")
     return False
@@ -106,19 +299,67 @@ def check_and_build_sandbox():
 def create_directories():
     """Create necessary directories"""
     dirs = ["templates", "static", "uploads"]
-    for d in dirs:
+    # One directory listing instead of a stat/mkdir attempt per directory
+    existing = set(os.listdir("."))
+    missing = [d for d in dirs if d not in existing]
+    for d in missing:
         os.makedirs(d, exist_ok=True)
-    print("✅ Directories created")
+    if missing:
+        print("✅ Directories created")
+
+def find_free_port(start=5000, tries=10):
+    """Return the first localhost port from start that can be bound, or None"""
+    import socket
+    for port in range(start, start + tries):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            # Match the server's own SO_REUSEADDR so TIME_WAIT ports count as free
+            # (on Windows the option would allow stealing a port in use)
+            if platform.system() != "Windows":
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(('127.0.0.1', port))
+            return port
+        except OSError:
+            continue
+        finally:
+            sock.close()
+    return None
+
+def serve_eventlet_nodelay(app, port):
+    """Serve the app like socketio.run does under eventlet, on a TCP_NODELAY listener"""
+    import socket
+    import eventlet
+    import eventlet.wsgi
+    listener = eventlet.listen(('127.0.0.1', port))
+    # Linux copies TCP_NODELAY onto accepted connections, so small Socket.IO
+    # frames are sent at once instead of waiting on Nagle and delayed ACKs
+    listener.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    eventlet.wsgi.server(listener, app, log_output=False)
+
+def open_browser_when_ready(url, port, timeout=15):
+    """Open the dashboard once the server accepts connections"""
+    import socket
+    import time
+    import webbrowser
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                break
+        time.sleep(0.02)
+    try:
+        webbrowser.open(url)
+    except Exception:
+        print("⚠️  Could not launch browser automatically. Open the link above manually.")
 
 def start_web_dashboard():
     """Start the web dashboard"""
+    import subprocess
+    import threading
     print("\n" + "="*60)
     print("🧊 Starting ZenCube Web Dashboard")
     print("="*60)
     print("\n📊 Server starting...")
-    print("🌐 A browser window will open automatically. If it does not:")
-    print("   http://127.0.0.1:5000")
-    print("   http://localhost:5000")
     print("📁 Tip: Upload examples/hello_python.py for a quick end-to-end demo.")
     print("⏹️  Press Ctrl+C to stop\n")
     
@@ -126,47 +367,36 @@ def start_web_dashboard():
         # Import after dependencies are checked
         import sys
         sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        # Persistent, pre-started worker processes for code analysis requests;
+        # started before the web stack is imported so workers stay lean
+        from code_analyzer import start_analysis_pool
+        analysis_pool = start_analysis_pool()
+        
         from web_dashboard import app, socketio
+        app.config['ANALYSIS_POOL'] = analysis_pool
         
         # Use 127.0.0.1 instead of 0.0.0.0 to avoid permission issues
-        # Try port 5000 first, fallback to 5001
-        import socket
-        port = 5000
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        result = sock.connect_ex(('127.0.0.1', port))
-        sock.close()
-        if result == 0:
-            fallback = port + 1
-            print(f"⚠️  Port {port} is in use, switching to {fallback}...")
-            port = fallback
+        port = find_free_port(5000)
+        if port is None:
+            print("❌ Could not start server. Please free up a port.")
+            sys.exit(1)
+        if port != 5000:
+            print(f"⚠️  Port 5000 is in use, switching to {port}...")
 
         url = f"http://127.0.0.1:{port}"
-        print(f"🔗 Dashboard URL: {url}")
-        try:
-            webbrowser.open(url)
-        except Exception:
-            print("⚠️  Could not launch browser automatically. Open the link above manually.")
+        print("🌐 A browser window will open automatically. If it does not:")
+        print(f"   {url}")
+        print(f"   http://localhost:{port}")
+        threading.Thread(target=open_browser_when_ready, args=(url, port), daemon=True).start()
 
-        socketio.run(app, host='127.0.0.1', port=port, debug=False, allow_unsafe_werkzeug=True)
-    except OSError as e:
-        if "Address already in use" in str(e):
-            print(f"\n❌ Port 5000 is already in use")
-            print("Trying port 5001...")
-            try:
-                alt_url = "http://127.0.0.1:5001"
-                print(f"🔗 Dashboard URL: {alt_url}")
-                try:
-                    webbrowser.open(alt_url)
-                except Exception:
-                    print("⚠️  Could not launch browser automatically. Open the link above manually.")
-                socketio.run(app, host='127.0.0.1', port=5001, debug=False, allow_unsafe_werkzeug=True)
-                print("🌐 Server running on: http://127.0.0.1:5001")
-            except:
-                print("❌ Could not start server. Please free up a port.")
-                sys.exit(1)
+        if socketio.async_mode == 'eventlet' and sys.platform.startswith('linux'):
+            serve_eventlet_nodelay(app, port)
         else:
-            print(f"\n❌ Error: {e}")
-            sys.exit(1)
+            run_options = {'allow_unsafe_werkzeug': True} if socketio.async_mode == 'threading' else {}
+            socketio.run(app, host='127.0.0.1', port=port, debug=False, **run_options)
+    except OSError as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
     except KeyboardInterrupt:
         print("\n\n👋 Shutting down...")
         sys.exit(0)
@@ -177,6 +407,7 @@ def start_web_dashboard():
 
 def start_gui():
     """Start the interactive desktop GUI (Tkinter)"""
+    import subprocess
     print("\n" + "="*60)
     print("🖥️  Starting ZenCube Desktop GUI (Interactive Terminal)")
     print("="*60)
@@ -187,15 +418,35 @@ def start_gui():
     print('   Use the "Browse File" button inside the GUI to select it.')
     print("⏹️  Close the GUI window to stop\n")
     try:
-        subprocess.check_call([sys.executable, "sandbox_test_gui.py"])
+        # Run the GUI in this interpreter rather than starting a second one
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import sandbox_test_gui
+    except ImportError as e:
+        print(f"⚠️  Could not load the GUI in-process ({e}), launching it separately...")
+        sandbox_test_gui = None
+    try:
+        if sandbox_test_gui is not None:
+            sandbox_test_gui.main()
+        else:
+            gui_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_test_gui.py")
+            if platform.system() != "Windows":
+                # Become the GUI process rather than waiting on a child; does not return
+                sys.stdout.flush()
+                os.execv(sys.executable, [sys.executable, gui_script])
+            subprocess.check_call([sys.executable, gui_script])
     except KeyboardInterrupt:
         print("\n\n👋 GUI closed")
     except subprocess.CalledProcessError as e:
         print(f"\n❌ Error launching GUI: {e}")
         sys.exit(e.returncode or 1)
+    except Exception as e:
+        # e.g. tkinter.TclError when no display is available
+        print(f"\n❌ Error launching GUI: {e}")
+        sys.exit(1)
 
 def main():
     """Main entry point"""
+    import argparse
     parser = argparse.ArgumentParser(description="ZenCube - Single Command Runner")
     parser.add_argument(
         "--mode",
@@ -204,6 +455,15 @@ def main():
         help="Choose how to run ZenCube: 'web' (default) launches the Flask dashboard, 'gui' opens the desktop terminal UI"
     )
     args = parser.parse_args()
+    
+    if args.mode == "web":
+        # The dashboard serves with eventlet when it's installed; it must
+        # patch the standard library before Flask is imported
+        try:
+            import eventlet
+            eventlet.monkey_patch()
+        except ImportError:
+            pass
 
     print("""
     ╔═══════════════════════════════════════════════════════════╗
@@ -212,20 +472,26 @@ def main():
     ╚═══════════════════════════════════════════════════════════╝
     """)
     
-    # Step 1: Create directories (web dashboard uses these; harmless for GUI)
-    create_directories()
+    # The setup steps are independent, so run them side by side:
+    # directories (web dashboard uses these; harmless for GUI), dependencies
+    # and, in web mode, the sandbox build (the GUI builds it on launch)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        dirs_ready = executor.submit(create_directories)
+        deps_ready = executor.submit(check_and_install_dependencies)
+        sandbox_ready = executor.submit(check_and_build_sandbox) if args.mode == "web" else None
     
-    # Step 2: Check and install dependencies
-    if not check_and_install_dependencies():
+    # result() re-raises anything a step raised, as running them in turn did
+    dirs_ready.result()
+    if sandbox_ready is not None:
+        sandbox_ready.result()
+    if not deps_ready.result():
         print("\n❌ Please install dependencies manually:")
         print("   pip3 install -r requirements.txt")
         sys.exit(1)
     
     if args.mode == "web":
-        # Web mode: ensure sandbox then start dashboard
-        check_and_build_sandbox()
+        # Web mode: sandbox is ready, start dashboard
         print("\n🚀 Starting web dashboard...\n")
-        time.sleep(1)
         start_web_dashboard()
     else:
         # Start desktop GUI on demand
@@ -11,7 +11,220 @@ import threading
 import os
 import platform
 import shlex
-from code_analyzer import CodeAnalyzer
+import stat
+import shutil
+import hashlib
+import functools
+import tempfile
+import queue
+import time
+import codecs
+import selectors
+import re
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from code_analyzer import CodeAnalyzer, SUPPORTED_EXTENSIONS
+
+if os.name == 'nt':
+    import _winapi
+    import msvcrt
+else:
+    import termios
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Last resolved sandbox executable, so startup can skip probing for it
+SANDBOX_PATH_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "zencube", "sandbox_path")
+
+# Compiled C/C++/Java builds, one directory per (source, compiler) state;
+# the least recently used are dropped once the total passes the cap
+COMPILE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "zencube", "compile")
+COMPILE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# A Java package declaration; only the head of the source is searched
+PACKAGE_RE = re.compile(rb'^\s*package\s+([\w.]+)\s*;', re.MULTILINE)
+
+# Headers next to a C/C++ source, whose state is part of its build's cache key
+_HEADER_EXTS = ('.h', '.hh', '.hpp', '.hxx')
+
+# Display name and whether auto-compile applies, by file extension
+_FILETYPE_BY_EXT = {
+    '.py': ("Python script", False),
+    '.java': ("Java source", True),
+    '.c': ("C source", True),
+    '.cpp': ("C++ source", True),
+    '.cc': ("C++ source", True),
+    '.cxx': ("C++ source", True),
+    '.sh': ("Shell script", False),
+    '.js': ("JavaScript", False),
+    '.rb': ("Ruby script", False),
+    '.pl': ("Perl script", False),
+}
+
+# Leading bytes that identify a file regardless of its extension
+_BINARY_MAGIC = (
+    (b'\x7fELF', "ELF executable"),
+    (b'MZ', "Windows executable"),
+    (b'\xcf\xfa\xed\xfe', "Mach-O executable"),
+    (b'PK\x03\x04', "Java archive"),
+)
+
+# Interpreter for scripts without a shebang line
+_INTERPRETER_BY_EXT = {
+    '.py': 'python3',
+    '.sh': 'bash',
+    '.js': 'node',
+    '.rb': 'ruby',
+    '.pl': 'perl',
+}
+
+# UI colours
+PALETTE = {
+    "background": "#0f172a",
+    "card": "#111c2f",
+    "terminal": "#0b1120",
+    "terminal_header": "#1e293b",
+    "text_primary": "#e2e8f0",
+    "text_secondary": "#94a3b8",
+    "accent": "#38bdf8",
+    "accent_hover": "#0ea5e9",
+    "danger": "#f87171",
+    "danger_hover": "#ef4444",
+    "terminal_prompt": "#22d3ee",
+    "terminal_input": "#facc15",
+}
+
+# A compiled Java program: run as `java -cp class_dir class_name`
+JavaTarget = namedtuple("JavaTarget", ["class_dir", "class_name"])
+
+# Text tags configured once on the terminal widget
+PROMPT_TAG = "prompt"
+# Text mark at the start of the user's input, just after the "$ " prompt
+INPUT_MARK = "input_start"
+# Text mark just before the "$ " prompt
+PROMPT_MARK = "prompt_start"
+INPUT_TAG = "input"
+ANALYSIS_TAG = "analysis"
+
+# Seconds to wait for code analysis before running the sandbox without it
+ANALYSIS_TIMEOUT = 15
+
+# Rules framing the log's section banners and analysis headings
+_HR = "=" * 60 + "\n"
+_HR_THIN = "-" * 60 + "\n"
+
+# The sandbox's report of a breached limit; searched without lowercasing the output
+RESOURCE_LIMIT_RE = re.compile(r"RESOURCE LIMIT VIOLATED|limit exceeded", re.IGNORECASE)
+
+# How long a stopped program gets to exit on SIGTERM before it is killed
+STOP_GRACE_SECONDS = 2
+
+# Output silence after which a program on a pipe is assumed to wait for input
+PROMPT_IDLE_SECONDS = 0.5
+# On a terminal the prompt is shown as soon as a burst of output settles
+PTY_PROMPT_SETTLE_SECONDS = 0.05
+
+# Terminal output is buffered and written to the Text widget at most this often
+LOG_FLUSH_INTERVAL_MS = 33
+# Oldest terminal lines are dropped beyond this many
+MAX_TERMINAL_LINES = 5000
+
+# Keeps compiler runs from flashing a console window on Windows
+NO_WINDOW_FLAGS = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+
+# PATH lookups, remembered for the rest of the session
+_which = functools.lru_cache(maxsize=32)(shutil.which)
+
+# Capacity requested for the sandbox output pipe, and the most read from it at once
+PIPE_BUFFER_SIZE = 65536
+
+def open_output_pipe():
+    """Return (read_fd, write_fd) for the child's merged stdout/stderr
+    
+    Windows anonymous pipes default to a 4 KiB buffer, which makes a chatty
+    child block after every few lines until the reader catches up; ask for
+    PIPE_BUFFER_SIZE instead. Linux pipes already hold 64 KiB.
+    """
+    if os.name == 'nt':
+        read_handle, write_handle = _winapi.CreatePipe(None, PIPE_BUFFER_SIZE)
+        return msvcrt.open_osfhandle(read_handle, os.O_RDONLY), msvcrt.open_osfhandle(write_handle, 0)
+    return os.pipe()
+
+def open_output_pty():
+    """Return (master_fd, slave_fd) of a pseudo-terminal for the child (Unix only)
+    
+    Echo is turned off because the GUI echoes input itself, and so is the
+    \\n -> \\r\\n output translation.
+    """
+    master, slave = os.openpty()
+    attrs = termios.tcgetattr(slave)
+    attrs[1] &= ~termios.ONLCR
+    attrs[3] &= ~termios.ECHO
+    termios.tcsetattr(slave, termios.TCSANOW, attrs)
+    return master, slave
+
+@functools.lru_cache(maxsize=None)
+def compiler_version(compiler):
+    """Return the compiler's version banner (queried once per process)"""
+    flag = '-version' if compiler == 'javac' else '--version'
+    try:
+        result = subprocess.run([compiler, flag], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True, timeout=10, close_fds=True,
+                                creationflags=NO_WINDOW_FLAGS)
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    return result.stdout.strip().split("\n", 1)[0]
+
+
+def local_headers_state(source_dir):
+    """Return (name, mtime_ns, size) for the headers in source_dir, sorted by name"""
+    state = []
+    try:
+        with os.scandir(source_dir) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(_HEADER_EXTS) and entry.is_file():
+                    st = entry.stat()
+                    state.append((entry.name, st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    return sorted(state)
+
+
+def java_package(file_path):
+    """Return the package a Java source declares, or None"""
+    try:
+        with open(file_path, 'rb') as src:
+            match = PACKAGE_RE.search(src.read(4096))
+    except OSError:
+        return None
+    return match.group(1).decode('ascii') if match else None
+
+
+def evict_compile_cache(keep=None):
+    """Remove the least recently used builds until the cache fits COMPILE_CACHE_MAX_BYTES"""
+    entries = []
+    total = 0
+    try:
+        with os.scandir(COMPILE_CACHE_DIR) as it:
+            dirs = [entry.path for entry in it
+                    if entry.is_dir() and not entry.name.startswith("tmp_")]  # tmp_: builds in progress
+    except OSError:
+        return
+    for path in dirs:
+        try:
+            size = 0
+            for root, _, files in os.walk(path):
+                size += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+            entries.append((os.stat(path).st_mtime, size, path))
+        except OSError:
+            continue  # removed meanwhile
+        total += size
+    for _, size, path in sorted(entries):
+        if total <= COMPILE_CACHE_MAX_BYTES:
+            break
+        if path != keep:
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
 
 class SandboxTestGUI:
     def __init__(self, root):
@@ -26,7 +239,10 @@ class SandboxTestGUI:
         
         # Variables
         self.selected_file = None
-        self.sandbox_path = self.find_sandbox()
+        # Derived from selected_file once, when a file is chosen
+        self._ext = ""
+        self._needs_compile = False
+        self.sandbox_path = self.load_cached_sandbox_path()
         self.is_running = False
         self.compiled_files = []  # Track compiled files for cleanup
         self.current_process = None
@@ -36,6 +252,20 @@ class SandboxTestGUI:
         self.current_input_line = ""
         self.last_command = []
         self.analyzer = CodeAnalyzer()
+        self._log_queue = deque()  # (text, tag) fragments waiting to be written
+        self._log_flush_pending = False
+        self._pending_status = None  # status bar text waiting for the next flush
+        # Analysis starts as soon as a file is selected
+        self._analysis_pool = self._new_analysis_pool()
+        self._analysis_future = None
+        self._analysis_key = None
+        self._source = None  # (source state, bytes) of the last file read in full
+        # Formatted analysis reports, so re-running an unchanged file skips the analyzer
+        self._analysis_report = functools.lru_cache(maxsize=32)(self._format_analysis)
+        # Analyze & Run jobs execute one at a time on a single long-lived worker
+        self._jobs = queue.Queue()
+        self._worker = threading.Thread(target=self._pump, daemon=True)
+        self._worker.start()
         
         # Resource limit variables
         self.cpu_enabled = tk.BooleanVar(value=False)
@@ -51,32 +281,16 @@ class SandboxTestGUI:
         self.create_widgets()
         self.show_ready_message()
         
-        # Check sandbox
+        # Locate the sandbox in the background so the window paints immediately
         if not self.sandbox_path:
-            messagebox.showwarning(
-                "Sandbox Not Found",
-                "Sandbox executable not found!\n\n"
-                "Please build the project first:\n"
-                "  make\n\n"
-                "Or place sandbox.exe in the project directory."
-            )
+            threading.Thread(target=self._resolve_sandbox_async, daemon=True).start()
     
     def apply_styles(self):
         """Apply custom styling for the modern UI"""
-        palette = {
-            "background": "#0f172a",
-            "card": "#111c2f",
-            "terminal": "#0b1120",
-            "terminal_header": "#1e293b",
-            "text_primary": "#e2e8f0",
-            "text_secondary": "#94a3b8",
-            "accent": "#38bdf8",
-            "accent_hover": "#0ea5e9",
-            "danger": "#f87171",
-            "danger_hover": "#ef4444",
-            "terminal_prompt": "#22d3ee",
-            "terminal_input": "#facc15",
-        }
+        # ttk styles live in the root's Tcl interpreter; configure each root once
+        if getattr(self.root, "_zencube_styles_applied", False):
+            return
+        palette = PALETTE
         
         # Use clam theme for better ttk styling support
         try:
@@ -123,29 +337,63 @@ class SandboxTestGUI:
             background=[("disabled", "#1e293b"), ("active", palette["danger_hover"]), ("pressed", palette["danger_hover"]), ("!disabled", palette["danger"])],
             foreground=[("disabled", "#475569"), ("!disabled", "#0f172a")]
         )
+        self.root._zencube_styles_applied = True
 
+    def load_cached_sandbox_path(self):
+        """Return the sandbox path saved by a previous run, if it still exists"""
+        try:
+            with open(SANDBOX_PATH_CACHE) as f:
+                cached = f.read().strip()
+        except OSError:
+            return None
+        return cached if cached and os.path.exists(cached) else None
+    
+    def _resolve_sandbox_async(self):
+        """Probe for the sandbox off the UI thread and report back to it"""
+        path = self.find_sandbox()
+        self.root.after(0, self._on_sandbox_resolved, path)
+    
+    def _on_sandbox_resolved(self, path):
+        """Record the probed sandbox path, or warn that it is missing"""
+        self.sandbox_path = path
+        if not path:
+            messagebox.showwarning(
+                "Sandbox Not Found",
+                "Sandbox executable not found!\n\n"
+                "Please build the project first:\n"
+                "  make\n\n"
+                "Or place sandbox.exe in the project directory."
+            )
+            return
+        try:
+            os.makedirs(os.path.dirname(SANDBOX_PATH_CACHE), exist_ok=True)
+            with open(SANDBOX_PATH_CACHE, "w") as f:
+                f.write(path)
+        except OSError:
+            pass
+    
     def find_sandbox(self):
         """Find the sandbox executable"""
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        
         # Check common locations
         paths_to_check = [
-            os.path.join(script_dir, "sandbox"),
-            os.path.join(script_dir, "sandbox.exe"),
-            os.path.join(script_dir, "build", "sandbox"),
-            os.path.join(script_dir, "build", "Release", "sandbox.exe"),
-            "./sandbox",
-            "./sandbox.exe"
+            os.path.join(SCRIPT_DIR, "sandbox"),
+            os.path.join(SCRIPT_DIR, "sandbox.exe"),
+            os.path.join(SCRIPT_DIR, "build", "sandbox"),
+            os.path.join(SCRIPT_DIR, "build", "Release", "sandbox.exe"),
         ]
+        cwd = os.getcwd()
+        if cwd != SCRIPT_DIR:
+            paths_to_check += [os.path.join(cwd, "sandbox"), os.path.join(cwd, "sandbox.exe")]
         
-        for path in paths_to_check:
-            full_path = os.path.abspath(path)
-            if os.path.exists(full_path):
-                if platform.system() != "Windows":
-                    if os.access(full_path, os.X_OK):
-                        return full_path
-                else:
-                    return full_path
+        is_windows = platform.system() == "Windows"
+        for full_path in paths_to_check:
+            # A single stat answers both "does it exist" and "is it executable"
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                continue
+            if is_windows or st.st_mode & stat.S_IXUSR:
+                return full_path
         
         return None
     
@@ -290,20 +538,18 @@ class SandboxTestGUI:
             undo=False
         )
         self.output_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        self.output_text.tag_configure("prompt", foreground="#22d3ee", font=("Consolas", 11, "bold"))
-        self.output_text.tag_configure("input", foreground="#facc15")
-        self.output_text.tag_configure("analysis", foreground="#a855f7", font=("Consolas", 11, "bold"))
+        self.output_text.tag_configure(PROMPT_TAG, foreground="#22d3ee", font=("Consolas", 11, "bold"))
+        self.output_text.tag_configure(INPUT_TAG, foreground="#facc15")
+        self.output_text.tag_configure(ANALYSIS_TAG, foreground="#a855f7", font=("Consolas", 11, "bold"))
         
         # Terminal prompt marker
         self.input_start_marker = None
         self.waiting_for_input = False
         
-        # Bind keyboard events for terminal-like input
+        # Bind keyboard events for terminal-like input; on_key_press
+        # dispatches Return and BackSpace itself
         self.output_text.bind('<KeyPress>', self.on_key_press)
-        self.output_text.bind('<Return>', self.on_enter_key)
-        self.output_text.bind('<BackSpace>', self.on_backspace)
         self.output_text.bind('<Button-1>', self.on_click)
-        self.output_text.bind('<Key>', self.on_any_key)
         self.output_text.focus_set()
         
         # Status Bar & result
@@ -331,8 +577,8 @@ class SandboxTestGUI:
             return
         
         content = self.output_text.get("1.0", tk.END).strip()
-        if content:
-            self.log_output('\n💡 Sandbox idle. Select a file and click "Analyze & Run in Sandbox" to start again.\n', tag="analysis")
+        if content or self._log_queue:
+            self.log_output('\n💡 Sandbox idle. Select a file and click "Analyze & Run in Sandbox" to start again.\n', tag=ANALYSIS_TAG)
             self.update_status("Ready - select a new file or rerun the current one")
             return
         
@@ -344,7 +590,7 @@ class SandboxTestGUI:
             "3. Press \"Analyze & Run in Sandbox\" to scan and execute.\n"
             "Tip: Works with Python, Java, C/C++, Shell, JavaScript, Ruby, and more.\n\n"
         )
-        self.log_output(intro, tag="analysis")
+        self.log_output(intro, tag=ANALYSIS_TAG)
         self.update_status("Ready - select a file, then click Analyze & Run")
     
     def browse_file(self):
@@ -367,30 +613,13 @@ class SandboxTestGUI:
         if file_path:
             self.selected_file = file_path
             file_name = os.path.basename(file_path)
-            file_ext = os.path.splitext(file_path)[1].lower()
+            self._ext = os.path.splitext(file_name)[1].lower()
+            if self._ext in SUPPORTED_EXTENSIONS:
+                self.prefetch_analysis(file_path)
             
             # Detect file type
-            file_type = "Executable"
-            needs_compile = False
-            if file_ext == '.py':
-                file_type = "Python script"
-            elif file_ext == '.java':
-                file_type = "Java source"
-                needs_compile = True
-            elif file_ext == '.c':
-                file_type = "C source"
-                needs_compile = True
-            elif file_ext in ['.cpp', '.cc', '.cxx']:
-                file_type = "C++ source"
-                needs_compile = True
-            elif file_ext == '.sh':
-                file_type = "Shell script"
-            elif file_ext == '.js':
-                file_type = "JavaScript"
-            elif file_ext == '.rb':
-                file_type = "Ruby script"
-            elif file_ext == '.pl':
-                file_type = "Perl script"
+            file_type, needs_compile = self.detect_file_type(file_path, self._ext)
+            self._needs_compile = needs_compile
             
             # Enable/disable compile checkbox based on file type
             self.compile_checkbox.config(state=tk.NORMAL if needs_compile else tk.DISABLED)
@@ -401,67 +630,264 @@ class SandboxTestGUI:
                 text=f"Selected: {file_name} ({file_type})",
                 foreground="#e2e8f0"
             )
-            self.log_output(f"✅ File selected: {file_path} ({file_type})\n", tag="analysis")
+            self.log_output(f"✅ File selected: {file_path} ({file_type})\n", tag=ANALYSIS_TAG)
             self.analyze_run_button.config(state=tk.NORMAL)
             self.update_status(f"Ready to analyze: {file_name}")
     
-    def compile_file(self, file_path):
-        """Compile C, C++, or Java files"""
-        file_ext = os.path.splitext(file_path)[1].lower()
-        file_dir = os.path.dirname(file_path)
+    def _run_capture(self, cmd, timeout, on_line=None):
+        """Run cmd to completion and return (returncode, output).
+        
+        stdout and stderr are merged and drained continuously by a reader
+        thread, so a chatty child can never block on a full pipe the way it
+        would behind a bare Popen.wait(). Each line is passed to on_line as it
+        arrives. On timeout the child is killed and TimeoutExpired is re-raised.
+        """
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,  # one pipe for both streams
+            text=True,
+            bufsize=1,
+            close_fds=True,
+            creationflags=NO_WINDOW_FLAGS
+        )
+        output_lines = []
+        
+        def read_output():
+            for line in process.stdout:
+                output_lines.append(line)
+                if on_line:
+                    on_line(line)
+            process.stdout.close()
+        
+        reader = threading.Thread(target=read_output, daemon=True)
+        reader.start()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            reader.join()
+        return process.returncode, ''.join(output_lines)
+    
+    @staticmethod
+    def _source_state(file_path):
+        """Identify the current contents of file_path by path, mtime and size"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return (file_path, st.st_mtime_ns, st.st_size)
+    
+    def prefetch_analysis(self, file_path):
+        """Start analyzing file_path in the background"""
+        self._analysis_key = self._source_state(file_path)
+        self._analysis_future = self._analysis_pool.submit(self._analyze_source, file_path)
+    
+    def _analyze_source(self, file_path):
+        """Analyze file_path from the bytes shared with build_command"""
+        try:
+            content = self._load_source(file_path)
+        except OSError:
+            content = None  # let the analyzer report the missing file
+        return self.analyzer.analyze_file(file_path, content)
+    
+    def _load_source(self, file_path):
+        """Read file_path once and keep its bytes for the analyzer and shebang check"""
+        state = self._source_state(file_path)
+        if self._source is not None and self._source[0] == state:
+            return self._source[1]
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        self._source = (state, content)
+        return content
+    
+    def _cached_source(self, file_path):
+        """Return the bytes read by _load_source if file_path is unchanged since"""
+        source = self._source
+        if source is not None and source[0] == self._source_state(file_path):
+            return source[1]
+        return None
+    
+    def get_analysis(self, file_path):
+        """Return the analysis of file_path, reusing the prefetch if the file is unchanged"""
+        if self._analysis_future is None or self._analysis_key != self._source_state(file_path):
+            self.prefetch_analysis(file_path)
+        try:
+            return self._analysis_future.result(timeout=ANALYSIS_TIMEOUT)
+        except FutureTimeoutError:
+            self._abandon_analysis()
+            return {"error": f"Analysis timed out after {ANALYSIS_TIMEOUT} seconds"}
+    
+    def _format_analysis(self, state):
+        """Return the analysis report of a source state as (text, tag) segments
+        
+        Memoized per (path, mtime_ns, size) by self._analysis_report. Analyzer
+        errors raise ValueError instead, so they are reported but never cached.
+        """
+        # An unreadable file has no state; the analyzer reports why
+        analysis_result = self.get_analysis(state[0] if state else self.selected_file)
+        if "error" in analysis_result:
+            raise ValueError(analysis_result['error'])
+        
+        report = []
+        def add(text, tag=None):
+            # Adjacent text with the same tag goes out as one log_output call
+            if report and report[-1][1] == tag:
+                report[-1] = (report[-1][0] + text, tag)
+            else:
+                report.append((text, tag))
+        
+        # Display vulnerabilities
+        if analysis_result.get('vulnerabilities'):
+            add("🚨 VULNERABILITIES FOUND:\n", ANALYSIS_TAG)
+            add(_HR_THIN, ANALYSIS_TAG)
+            for vuln in analysis_result['vulnerabilities']:
+                add(f"❌ {vuln['type']}\n")
+                add(f"   Line {vuln['line']}: {vuln['message']}\n")
+                if 'code' in vuln:
+                    add(f"   Code: {vuln['code'].strip()}\n")
+                add("\n")
+        else:
+            add("✅ No critical vulnerabilities detected!\n\n")
+        
+        # Display warnings
+        if analysis_result.get('warnings'):
+            add("⚠️  WARNINGS:\n", ANALYSIS_TAG)
+            add(_HR_THIN, ANALYSIS_TAG)
+            for warn in analysis_result['warnings']:
+                add(f"⚠️  {warn['type']}\n")
+                add(f"   Line {warn['line']}: {warn['message']}\n\n")
+        
+        # Display info
+        if analysis_result.get('info'):
+            add("ℹ️  INFORMATION:\n", ANALYSIS_TAG)
+            add(_HR_THIN, ANALYSIS_TAG)
+            for info in analysis_result['info']:
+                add(f"ℹ️  {info['message']}\n")
+        
+        # Summary
+        vuln_count = len(analysis_result.get('vulnerabilities', []))
+        warn_count = len(analysis_result.get('warnings', []))
+        add(f"\n{_HR}📊 Analysis Summary: {vuln_count} vulnerabilities, {warn_count} warnings\n{_HR}\n", ANALYSIS_TAG)
+        return tuple(report)
+    
+    @staticmethod
+    def _new_analysis_pool():
+        """Single worker, so the shared analyzer is only ever used by one thread"""
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="zencube-analysis")
+    
+    def _abandon_analysis(self):
+        """Leave a runaway analysis behind and start over with a fresh worker
+        
+        Threads can't be interrupted, so the stuck job keeps its worker and
+        analyzer; later files get their own so they don't queue behind it.
+        """
+        self._analysis_pool.shutdown(wait=False)
+        self._analysis_pool = self._new_analysis_pool()
+        self.analyzer = CodeAnalyzer()
+        self._analysis_future = None
+        self._analysis_key = None
+    
+    @staticmethod
+    def detect_file_type(file_path, file_ext):
+        """Return (display name, needs compile) from the file's leading bytes and extension"""
+        try:
+            with open(file_path, 'rb') as f:
+                head = f.read(8)
+        except OSError:
+            head = b''
+        # Binaries are recognised even when renamed to a source extension
+        for magic, file_type in _BINARY_MAGIC:
+            if head.startswith(magic):
+                return file_type, False
+        if file_ext in _FILETYPE_BY_EXT:
+            return _FILETYPE_BY_EXT[file_ext]
+        if head.startswith(b'#!'):
+            return "Script", False
+        return "Executable", False
+    
+    def compile_file(self, file_path, file_ext=None):
+        """Compile C, C++, or Java files, reusing the cached build of an unchanged source
+        
+        Returns the executable's path for C/C++, a JavaTarget for Java, or
+        None for other file types. file_ext defaults to file_path's extension.
+        A C/C++ build is keyed on the headers in the source's own directory
+        too; headers included from anywhere else are not tracked.
+        """
+        if file_ext is None:
+            file_ext = os.path.splitext(file_path)[1].lower()
         file_base = os.path.splitext(os.path.basename(file_path))[0]
         
-        compiled_path = None
-        compile_cmd = None
+        if file_ext == '.c':
+            compiler, language, artifact = 'gcc', "C", file_base
+        elif file_ext in ['.cpp', '.cc', '.cxx']:
+            compiler, language, artifact = 'g++', "C++", file_base
+        elif file_ext == '.java':
+            # Java compiles to a .class file named after the source, under
+            # javac -d in the directory of its package
+            package = java_package(file_path)
+            class_name = f"{package}.{file_base}" if package else file_base
+            compiler, language = 'javac', "Java"
+            artifact = os.path.join(*class_name.split(".")) + ".class"
+        else:
+            return None
         
         try:
-            if file_ext == '.c':
-                # Compile C file
-                compiled_path = os.path.join(file_dir, file_base)
-                compile_cmd = ['gcc', '-o', compiled_path, file_path]
-                self.log_output(f"Compiling C file: gcc -o {compiled_path} {file_path}\n")
-                
-            elif file_ext in ['.cpp', '.cc', '.cxx']:
-                # Compile C++ file
-                compiled_path = os.path.join(file_dir, file_base)
-                compile_cmd = ['g++', '-o', compiled_path, file_path]
-                self.log_output(f"Compiling C++ file: g++ -o {compiled_path} {file_path}\n")
-                
-            elif file_ext == '.java':
-                # Compile Java file
-                # Java compiles to .class file in same directory
-                compile_cmd = ['javac', file_path]
-                class_file = os.path.join(file_dir, f"{file_base}.class")
-                self.log_output(f"Compiling Java file: javac {file_path}\n")
-                compiled_path = class_file
+            st = os.stat(file_path)
+            headers = local_headers_state(os.path.dirname(os.path.abspath(file_path))) if compiler != 'javac' else []
+            key = hashlib.blake2b(
+                f"{os.path.abspath(file_path)}|{st.st_mtime_ns}|{st.st_size}|{compiler_version(compiler)}|{headers}".encode(),
+                digest_size=16
+            ).hexdigest()
+            cache_dir = os.path.join(COMPILE_CACHE_DIR, key)
             
-            if compile_cmd:
-                # Run compilation
-                result = subprocess.run(
-                    compile_cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                if result.returncode != 0:
-                    error_msg = result.stderr or result.stdout
-                    raise Exception(f"Compilation failed:\n{error_msg}")
+            if os.path.exists(os.path.join(cache_dir, artifact)):
+                os.utime(cache_dir)  # mark as recently used
+                self.log_output(f"✓ Source unchanged, reusing cached {language} build\n\n")
+            else:
+                # Build into a scratch directory and move it into place only on success
+                os.makedirs(COMPILE_CACHE_DIR, exist_ok=True)
+                build_dir = tempfile.mkdtemp(dir=COMPILE_CACHE_DIR, prefix="tmp_")
+                try:
+                    if file_ext == '.java':
+                        compile_cmd = ['javac', '-d', build_dir, file_path]
+                    else:
+                        compile_cmd = [compiler, '-o', os.path.join(build_dir, artifact), file_path]
+                    self.log_output(f"Compiling {language} file: {' '.join(compile_cmd)}\n")
+                    
+                    # Run compilation, streaming diagnostics to the terminal as they arrive
+                    returncode, _ = self._run_capture(
+                        compile_cmd,
+                        timeout=30,
+                        on_line=self.log_output
+                    )
+                    
+                    if returncode != 0:
+                        # The compiler's messages have already been shown above
+                        raise Exception(f"Compilation failed (exit code {returncode})")
+                    
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+                    os.replace(build_dir, cache_dir)
+                finally:
+                    shutil.rmtree(build_dir, ignore_errors=True)
                 
+                evict_compile_cache(keep=cache_dir)
                 self.log_output("✓ Compilation successful!\n\n")
-                
-                # For Java, return the class name (without .class extension)
-                if file_ext == '.java':
-                    return file_base, file_dir
-                
-                return compiled_path, None
+            
+            # For Java, return the classpath and fully qualified class name
+            if file_ext == '.java':
+                return JavaTarget(cache_dir, class_name)
+            
+            return os.path.join(cache_dir, artifact)
                 
         except subprocess.TimeoutExpired:
             raise Exception("Compilation timed out")
         except Exception as e:
             raise Exception(f"Compilation error: {str(e)}")
-        
-        return None, None
     
     def build_command(self):
         """Build the sandbox command with selected options"""
@@ -488,16 +914,17 @@ class SandboxTestGUI:
         
         # Detect file type and handle compilation if needed
         file_path = self.selected_file
-        file_ext = os.path.splitext(file_path)[1].lower()
-        file_name = os.path.basename(file_path).lower()
+        file_ext = self._ext
         
         interpreter = None
         exec_file = file_path
+        java_target = None
         
         # Handle compiled languages (C, C++, Java)
-        if file_ext in ['.c', '.cpp', '.cc', '.cxx'] and self.auto_compile.get():
+        compile_now = self._needs_compile and self.auto_compile.get()
+        if compile_now and file_ext != '.java':
             try:
-                compiled_file, _ = self.compile_file(file_path)
+                compiled_file = self.compile_file(file_path, file_ext)
                 if compiled_file and os.path.exists(compiled_file):
                     exec_file = compiled_file
                 else:
@@ -505,64 +932,53 @@ class SandboxTestGUI:
             except Exception as e:
                 raise ValueError(f"Failed to compile {file_path}: {str(e)}")
         
-        elif file_ext == '.java' and self.auto_compile.get():
+        elif compile_now:
             try:
-                class_name, class_dir = self.compile_file(file_path)
-                if class_name:
+                java_target = self.compile_file(file_path, file_ext)
+                if java_target:
                     interpreter = 'java'
-                    # Java needs classpath and class name
-                    exec_file = f"-cp {class_dir} {class_name}"
+                    exec_file = java_target.class_name
                 else:
                     raise ValueError("Java compilation failed - no class file generated")
             except Exception as e:
                 raise ValueError(f"Failed to compile Java file {file_path}: {str(e)}")
         
         else:
-            # Check for shebang in first line
+            # Check for shebang in first line, reusing the bytes read for analysis
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    first_line = f.readline().strip()
-                    if first_line.startswith('#!'):
-                        interpreter = first_line[2:].strip().split()[0]
-                        # If it's a path like /usr/bin/env python3, extract python3
-                        if '/env' in interpreter:
-                            interpreter = first_line.split()[-1]
+                content = self._cached_source(file_path)
+                if content is None:
+                    with open(file_path, 'rb') as f:
+                        content = f.readline()
+                end = content.find(b'\n')
+                first_line = content[:end if end >= 0 else None].decode('utf-8', errors='ignore').strip()
+                if first_line.startswith('#!'):
+                    interpreter = first_line[2:].strip().split()[0]
+                    # If it's a path like /usr/bin/env python3, extract python3
+                    if '/env' in interpreter:
+                        interpreter = first_line.split()[-1]
             except:
                 pass
             
             # Determine interpreter based on file extension
             if not interpreter:
-                if file_ext == '.py' or file_name.endswith('.py'):
-                    interpreter = 'python3'
-                elif file_ext == '.sh' or file_name.endswith('.sh'):
-                    interpreter = 'bash'
-                elif file_ext == '.js' or file_name.endswith('.js'):
-                    interpreter = 'node'
-                elif file_ext == '.rb' or file_name.endswith('.rb'):
-                    interpreter = 'ruby'
-                elif file_ext == '.pl' or file_name.endswith('.pl'):
-                    interpreter = 'perl'
+                interpreter = _INTERPRETER_BY_EXT.get(file_ext)
         
         # Validate exec_file is not empty
         if not exec_file or not exec_file.strip():
             raise ValueError("No executable file or command specified. Please select a valid file.")
         
         # Check if file exists (for non-Java cases)
-        if interpreter != 'java' and not os.path.exists(exec_file) and not os.path.isabs(exec_file):
+        if java_target is None and not os.path.exists(exec_file) and not os.path.isabs(exec_file):
             # Check if it's a command in PATH
-            import shutil
-            if not shutil.which(exec_file):
+            if not _which(exec_file):
                 raise ValueError(f"File or command not found: {exec_file}")
         
         # Add interpreter if needed
         if interpreter:
-            if interpreter == 'java':
-                # Java command is special - it includes classpath in exec_file
-                cmd.append(interpreter)
-                java_parts = shlex.split(exec_file)
-                if not java_parts:
-                    raise ValueError("Java execution command is empty. Please check compilation output.")
-                cmd.extend(java_parts)
+            if java_target is not None:
+                # Java needs classpath and class name as separate arguments
+                cmd.extend([interpreter, '-cp', java_target.class_dir, java_target.class_name])
             else:
                 cmd.append(interpreter)
                 cmd.append(exec_file)
@@ -611,63 +1027,38 @@ class SandboxTestGUI:
         # Clear previous output
         self.clear_output(show_ready=False)
         
-        # Run analysis and test in thread
-        thread = threading.Thread(target=self._analyze_and_run_thread, daemon=True)
-        thread.start()
+        # Run analysis and test on the worker thread
+        self._jobs.put(self._analyze_and_run_thread)
+    
+    def _pump(self):
+        """Worker loop: run queued jobs in order until a None sentinel arrives"""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            try:
+                job()
+            except Exception as e:
+                # Keep the worker alive for the next job
+                self.log_output(f"\n❌ Error: {str(e)}\n")
     
     def _analyze_and_run_thread(self):
         """Run analysis first, then execute test"""
         try:
             # Step 1: Code Analysis
-            self.log_output("=" * 60 + "\n", tag="analysis")
-            self.log_output("🔍 CODE ANALYSIS & VULNERABILITY DETECTION\n", tag="analysis")
-            self.log_output("=" * 60 + "\n\n", tag="analysis")
+            self.log_output(f"{_HR}🔍 CODE ANALYSIS & VULNERABILITY DETECTION\n{_HR}\n", tag=ANALYSIS_TAG)
             self.update_status("Analyzing code for vulnerabilities...")
             
-            file_ext = os.path.splitext(self.selected_file)[1].lower()
+            file_ext = self._ext
             
             # Check if file type is supported for analysis
-            if file_ext in ['.c', '.cpp', '.cc', '.cxx', '.py', '.java']:
+            if file_ext in SUPPORTED_EXTENSIONS:
                 try:
-                    analysis_result = self.analyzer.analyze_file(self.selected_file)
-                    
-                    if "error" in analysis_result:
-                        self.log_output(f"⚠️  Analysis Error: {analysis_result['error']}\n\n")
-                    else:
-                        # Display vulnerabilities
-                        if analysis_result.get('vulnerabilities'):
-                            self.log_output("🚨 VULNERABILITIES FOUND:\n", tag="analysis")
-                            self.log_output("-" * 60 + "\n", tag="analysis")
-                            for vuln in analysis_result['vulnerabilities']:
-                                self.log_output(f"❌ {vuln['type']}\n")
-                                self.log_output(f"   Line {vuln['line']}: {vuln['message']}\n")
-                                if 'code' in vuln:
-                                    self.log_output(f"   Code: {vuln['code'].strip()}\n")
-                                self.log_output("\n")
-                        else:
-                            self.log_output("✅ No critical vulnerabilities detected!\n\n")
-                        
-                        # Display warnings
-                        if analysis_result.get('warnings'):
-                            self.log_output("⚠️  WARNINGS:\n", tag="analysis")
-                            self.log_output("-" * 60 + "\n", tag="analysis")
-                            for warn in analysis_result['warnings']:
-                                self.log_output(f"⚠️  {warn['type']}\n")
-                                self.log_output(f"   Line {warn['line']}: {warn['message']}\n\n")
-                        
-                        # Display info
-                        if analysis_result.get('info'):
-                            self.log_output("ℹ️  INFORMATION:\n", tag="analysis")
-                            self.log_output("-" * 60 + "\n", tag="analysis")
-                            for info in analysis_result['info']:
-                                self.log_output(f"ℹ️  {info['message']}\n")
-                        
-                        # Summary
-                        vuln_count = len(analysis_result.get('vulnerabilities', []))
-                        warn_count = len(analysis_result.get('warnings', []))
-                        self.log_output("\n" + "=" * 60 + "\n", tag="analysis")
-                        self.log_output(f"📊 Analysis Summary: {vuln_count} vulnerabilities, {warn_count} warnings\n", tag="analysis")
-                        self.log_output("=" * 60 + "\n\n", tag="analysis")
+                    report = self._analysis_report(self._source_state(self.selected_file))
+                    for text, tag in report:
+                        self.log_output(text, tag=tag)
+                except ValueError as e:
+                    self.log_output(f"⚠️  Analysis Error: {e}\n\n")
                 except Exception as e:
                     self.log_output(f"❌ Analysis failed: {str(e)}\n\n")
             else:
@@ -675,9 +1066,7 @@ class SandboxTestGUI:
                 self.log_output("   (Analysis supports: .c, .cpp, .py, .java)\n\n")
             
             # Step 2: Run the test
-            self.log_output("=" * 60 + "\n")
-            self.log_output("▶️  RUNNING SANDBOX TEST\n")
-            self.log_output("=" * 60 + "\n\n")
+            self.log_output(f"{_HR}▶️  RUNNING SANDBOX TEST\n{_HR}\n")
             self.update_status("Running sandbox test...")
             
             # Now run the actual test
@@ -685,7 +1074,7 @@ class SandboxTestGUI:
             
         except Exception as e:
             self.log_output(f"\n❌ Error: {str(e)}\n")
-            self.result_label.config(text="❌ Error Occurred", foreground="red")
+            self._set_result("❌ Error Occurred", "red")
             self.update_status(f"Error: {str(e)}")
         finally:
             # Cleanup
@@ -693,19 +1082,23 @@ class SandboxTestGUI:
             self.process_stdin = None
             self.is_running = False
             self.waiting_for_input = False
-            self.analyze_run_button.config(state=tk.NORMAL)
-            self.stop_button.config(state=tk.DISABLED)
-            
-            # Show idle hint when finished
-            if not self.waiting_for_input:
-                self.show_ready_message()
+            self.root.after_idle(self._finish_run)
     
     def show_prompt(self):
         """Show terminal prompt"""
         if not self.waiting_for_input and self.is_running:
             # Only show prompt if process is running and not already waiting
-            self.output_text.insert(tk.END, "$ ", "prompt")
-            self.input_start_marker = self.output_text.index(tk.END + "-1c")
+            # Write out any buffered output first so the prompt lands after it
+            self._flush_log()
+            # Marks on both sides of the "$ " so it can be removed in one delete
+            self.output_text.mark_set(PROMPT_MARK, tk.END + "-1c")
+            self.output_text.mark_gravity(PROMPT_MARK, tk.LEFT)
+            self.output_text.insert(tk.END, "$ ", PROMPT_TAG)
+            # A mark (not a fixed index) so it follows the text when old lines are trimmed;
+            # left gravity keeps it before the characters the user types
+            self.output_text.mark_set(INPUT_MARK, tk.END + "-1c")
+            self.output_text.mark_gravity(INPUT_MARK, tk.LEFT)
+            self.input_start_marker = INPUT_MARK
             self.output_text.see(tk.END)
             self.waiting_for_input = True
             self.current_input_line = ""
@@ -713,22 +1106,16 @@ class SandboxTestGUI:
             self.output_text.mark_set(tk.INSERT, tk.END)
     
     def on_key_press(self, event):
-        """Handle key press in terminal"""
+        """Handle every key press in the terminal from a single binding"""
+        keysym = event.keysym
+        if keysym == 'Return':
+            return self.on_enter_key(event)
+        if keysym == 'BackSpace':
+            return self.on_backspace(event)
+        
         # Only restrict typing when waiting for input - allow normal typing otherwise
-        if self.waiting_for_input and self.is_running:
-            # When waiting for input, ensure cursor is after prompt
-            current_pos = self.output_text.index(tk.INSERT)
-            if self.input_start_marker and current_pos < self.input_start_marker:
-                # Move cursor to after prompt
-                self.output_text.mark_set(tk.INSERT, self.input_start_marker)
-        return None
-    
-    def on_any_key(self, event):
-        """Handle any key press"""
-        # When waiting for input, ensure we're typing after the prompt
-        if self.waiting_for_input and self.is_running:
-            current_pos = self.output_text.index(tk.INSERT)
-            if self.input_start_marker and current_pos < self.input_start_marker:
+        if self.waiting_for_input and self.is_running and self.input_start_marker:
+            if self.output_text.compare(tk.INSERT, "<", self.input_start_marker):
                 # Prevent editing before prompt - move cursor to after prompt
                 self.output_text.mark_set(tk.INSERT, self.input_start_marker)
                 return "break"
@@ -744,10 +1131,9 @@ class SandboxTestGUI:
             return None
         
         # Get the current line (after prompt)
-        current_pos = self.output_text.index(tk.INSERT)
         if self.input_start_marker:
             try:
-                input_text = self.output_text.get(self.input_start_marker, current_pos).strip()
+                input_text = self.output_text.get(self.input_start_marker, tk.INSERT).strip()
             except:
                 input_text = ""
         else:
@@ -758,15 +1144,15 @@ class SandboxTestGUI:
             if self.process_stdin and not self.process_stdin.closed:
                 self.process_stdin.write(input_text + "\n")
                 self.process_stdin.flush()
+                self._flush_log()
                 # Echo the input (without prompt) and add newline
                 if input_text:
-                    self.output_text.insert(tk.END, input_text, "input")
+                    self.output_text.insert(tk.END, input_text, INPUT_TAG)
                 self.output_text.insert(tk.END, "\n")
-                # Remove old prompt marker
+                # Remove old prompt marker; the reader shows the next prompt
+                # once the program's reply has settled
                 self.input_start_marker = None
                 self.waiting_for_input = False
-                # Wait a bit to see if program outputs something, then show new prompt
-                self.root.after(100, self._check_and_show_prompt)
             else:
                 self.log_output(f"\n[Error: Process stdin not available]\n")
         except Exception as e:
@@ -776,20 +1162,11 @@ class SandboxTestGUI:
         
         return "break"
     
-    def _check_and_show_prompt(self):
-        """Check if we should show prompt after sending input"""
-        if self.is_running and not self.waiting_for_input:
-            # Check if process is still running and might be waiting
-            if self.current_process and self.current_process.poll() is None:
-                # Process still running, might be waiting for more input
-                self.show_prompt()
-    
     def on_backspace(self, event):
         """Handle backspace - prevent deleting prompt"""
         # Only restrict backspace when waiting for input
-        if self.waiting_for_input and self.is_running:
-            current_pos = self.output_text.index(tk.INSERT)
-            if self.input_start_marker and current_pos <= self.input_start_marker:
+        if self.waiting_for_input and self.is_running and self.input_start_marker:
+            if self.output_text.compare(tk.INSERT, "<=", self.input_start_marker):
                 # Prevent deleting the prompt
                 return "break"
         return None
@@ -797,8 +1174,7 @@ class SandboxTestGUI:
     def on_click(self, event):
         """Handle mouse click - move cursor to end if clicking before prompt"""
         if self.waiting_for_input and self.is_running:
-            click_pos = self.output_text.index(f"@{event.x},{event.y}")
-            if self.input_start_marker and click_pos < self.input_start_marker:
+            if self.input_start_marker and self.output_text.compare(f"@{event.x},{event.y}", "<", self.input_start_marker):
                 # Move cursor to end
                 self.output_text.mark_set(tk.INSERT, tk.END)
                 return "break"
@@ -817,20 +1193,18 @@ class SandboxTestGUI:
                 cmd, interpreter, file_ext = self.build_command()
             except ValueError as e:
                 self.log_output(f"\n❌ Error building command: {str(e)}\n")
-                self.result_label.config(text="❌ Command Error", foreground="red")
+                self._set_result("❌ Command Error", "red")
                 self.update_status(f"Error: {str(e)}")
                 return
             
             # Validate command before running
             if not cmd or len(cmd) <= 1:
                 self.log_output(f"\n❌ Error: Empty command generated\n")
-                self.result_label.config(text="❌ Empty Command", foreground="red")
+                self._set_result("❌ Empty Command", "red")
                 self.update_status("Error: Empty command")
                 return
             
-            self.log_output("=" * 60 + "\n")
-            self.log_output("Starting Sandbox Test\n")
-            self.log_output("=" * 60 + "\n\n")
+            self.log_output(f"{_HR}Starting Sandbox Test\n{_HR}\n")
             if interpreter:
                 self.log_output(f"File type: {file_ext}, Interpreter: {interpreter}\n")
             display_cmd = " ".join(shlex.quote(part) for part in cmd)
@@ -838,176 +1212,269 @@ class SandboxTestGUI:
             self.log_output(f"Full command array: {cmd}\n\n")
             self.update_status("Running test...")
             
-            # Run the command
-            self.current_process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                stdin=subprocess.PIPE,
-                text=True,
-                bufsize=0,  # Unbuffered for better real-time output
-                universal_newlines=True
-            )
-            self.process_stdin = self.current_process.stdin
+            # Run the command. On Unix it gets a pseudo-terminal, so it line-buffers
+            # like in a real terminal and its input() prompts arrive right away
+            use_pty = os.name != 'nt'
+            output_fd, child_end = open_output_pty() if use_pty else open_output_pipe()
+            try:
+                self.current_process = subprocess.Popen(
+                    cmd,
+                    stdout=child_end,
+                    stderr=subprocess.STDOUT,
+                    stdin=child_end if use_pty else subprocess.PIPE,
+                    # The Text widget can't render escapes, so tty-aware programs
+                    # must not colour their output
+                    env={**os.environ, 'TERM': 'dumb', 'NO_COLOR': '1'} if use_pty else None,
+                    text=True,
+                    bufsize=1  # line-buffered stdin
+                )
+            except Exception:
+                os.close(output_fd)
+                raise
+            finally:
+                os.close(child_end)
             process = self.current_process
+            if use_pty:
+                # Input is typed into the terminal's master side
+                self.process_stdin = os.fdopen(os.dup(output_fd), 'w', buffering=1, encoding='utf-8')
+            else:
+                self.process_stdin = process.stdin
             
-            # Read output in real-time
+            # Read output in real-time, as raw chunks so partial lines such as
+            # input prompts show up immediately
             output_lines = []
-            import select
-            import time
+            # With a terminal, typed-ahead input is safe, so the prompt only waits for
+            # the output to settle; over a pipe, silence has to suggest a read
+            idle = PTY_PROMPT_SETTLE_SECONDS if use_pty else PROMPT_IDLE_SECONDS
+            for chunk in self._stream_output(process, output_fd, idle):
+                if not self.is_running:
+                    # Stopped by the user and still producing output
+                    self._terminate(process)
+                    break
+                if chunk:
+                    self.log_output(chunk)
+                    output_lines.append(chunk)
+                elif chunk is None and not self.waiting_for_input and self.is_running:
+                    # Output has gone quiet; let the user type (show_prompt
+                    # ignores repeats that land while a prompt is already up)
+                    self.root.after_idle(self.show_prompt)
             
-            # For Unix-like systems (macOS, Linux)
-            if hasattr(select, 'select'):
-                start_time = time.time()
-                timeout_seconds = 30  # Timeout for programs waiting for input
-                
-                while True:
-                    if not self.is_running:
-                        process.terminate()
-                        break
-                    
-                    # Check if process is still running
-                    poll_result = process.poll()
-                    if poll_result is not None:
-                        # Process ended, read remaining output
-                        remaining = process.stdout.read()
-                        if remaining:
-                            self.log_output(remaining)
-                            output_lines.append(remaining)
-                        return_code = poll_result
-                        break
-                    
-                    # Check if there's output available (non-blocking)
-                    ready, _, _ = select.select([process.stdout], [], [], 0.1)
-                    if ready:
-                        line = process.stdout.readline()
-                        if line:
-                            # Remove old prompt if output is coming
-                            if self.waiting_for_input and self.input_start_marker:
-                                try:
-                                    # Remove the prompt line
-                                    start_line = self.output_text.index(self.input_start_marker + "-2c")
-                                    end_line = self.output_text.index(self.input_start_marker)
-                                    self.output_text.delete(start_line, end_line)
-                                except:
-                                    pass
-                                self.input_start_marker = None
-                                self.waiting_for_input = False
-                            
-                            self.log_output(line)
-                            output_lines.append(line)
-                            start_time = time.time()  # Reset timeout on output
-                    else:
-                        # Check for timeout - program might be waiting for input
-                        # Use a shorter timeout to detect input waiting faster
-                        if time.time() - start_time > 0.5 and not self.waiting_for_input and self.is_running:
-                            # Show prompt if program appears to be waiting for input
-                            # This is a heuristic - if no output for 0.5s, might be waiting
-                            self.show_prompt()
-                            start_time = time.time()  # Reset timeout
-                    
-                    self.root.update_idletasks()
-                    time.sleep(0.05)  # Small delay to prevent CPU spinning
-                
-                # Make sure we got the return code
-                if return_code is None:
-                    return_code = process.wait(timeout=1)
-            else:
-                # Windows - simpler approach with timeout
-                import queue
-                import threading as th
-                
-                def read_output(pipe, q):
-                    for line in iter(pipe.readline, ''):
-                        q.put(line)
-                    pipe.close()
-                    q.put(None)
-                
-                q = queue.Queue()
-                th.Thread(target=read_output, args=(process.stdout, q), daemon=True).start()
-                
-                start_time = time.time()
-                timeout_seconds = 30
-                
-                while True:
-                    if not self.is_running:
-                        process.terminate()
-                        break
-                    
-                    try:
-                        line = q.get(timeout=0.1)
-                        if line is None:
-                            break
-                        
-                        # Remove old prompt if output is coming
-                        if self.waiting_for_input and self.input_start_marker:
-                            try:
-                                start_line = self.output_text.index(self.input_start_marker + "-2c")
-                                end_line = self.output_text.index(self.input_start_marker)
-                                self.output_text.delete(start_line, end_line)
-                            except:
-                                pass
-                            self.input_start_marker = None
-                            self.waiting_for_input = False
-                        
-                        self.log_output(line)
-                        output_lines.append(line)
-                        start_time = time.time()
-                    except queue.Empty:
-                        # Use shorter timeout to detect input waiting faster
-                        if time.time() - start_time > 0.5 and not self.waiting_for_input and self.is_running:
-                            # Show prompt if program appears to be waiting for input
-                            self.show_prompt()
-                            start_time = time.time()
-                        if process.poll() is not None:
-                            break
-                    
-                    self.root.update_idletasks()
-                
-                return_code = process.wait()
+            return_code = process.wait()
             
             # Analyze results
             output = ''.join(output_lines)
-            self.log_output("\n" + "=" * 60 + "\n")
+            self.log_output("\n" + _HR)
             
             if return_code == 0:
                 self.log_output("✓ Test completed successfully!\n")
-                self.result_label.config(text="✓ Test Passed", foreground="green")
+                self._set_result("✓ Test Passed", "green")
                 self.update_status("Test passed")
             else:
                 self.log_output(f"✗ Test failed with exit code: {return_code}\n")
-                self.result_label.config(text="✗ Test Failed", foreground="red")
+                self._set_result("✗ Test Failed", "red")
                 self.update_status(f"Test failed (exit code: {return_code})")
             
             # Check for resource limit violations
-            if "RESOURCE LIMIT VIOLATED" in output or "limit exceeded" in output.lower():
+            if RESOURCE_LIMIT_RE.search(output):
                 self.log_output("⚠ Resource limit was exceeded\n")
-                self.result_label.config(text="⚠ Resource Limit Exceeded", foreground="orange")
+                self._set_result("⚠ Resource Limit Exceeded", "orange")
             
-            self.log_output("=" * 60 + "\n")
+            self.log_output(_HR)
             
         except Exception as e:
             self.log_output(f"\n❌ Error: {str(e)}\n")
-            self.result_label.config(text="❌ Error Occurred", foreground="red")
+            self._set_result("❌ Error Occurred", "red")
             self.update_status(f"Error: {str(e)}")
         finally:
             # Cleanup
+            if self.process_stdin is not None:
+                try:
+                    self.process_stdin.close()
+                except OSError:
+                    pass
             self.current_process = None
             self.process_stdin = None
             self.is_running = False
             self.waiting_for_input = False
-            self.analyze_run_button.config(state=tk.NORMAL)
-            self.stop_button.config(state=tk.DISABLED)
+    
+    def _set_result(self, text, color):
+        """Set the result label from the worker thread; applied on the Tk loop"""
+        self.root.after_idle(functools.partial(self.result_label.config, text=text, foreground=color))
+    
+    def _finish_run(self):
+        """Re-enable the controls and show the idle hint once a run has ended"""
+        self.analyze_run_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        self.show_ready_message()
+    
+    @staticmethod
+    def _terminate(process):
+        """SIGTERM the child, then SIGKILL it if it outlives STOP_GRACE_SECONDS
+        
+        Waits on a pidfd where the OS has them, otherwise on Popen.wait().
+        """
+        if process.poll() is not None:
+            return
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            pidfd = None
+        try:
+            process.terminate()
+            if pidfd is None:
+                try:
+                    process.wait(timeout=STOP_GRACE_SECONDS)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                return
+            with selectors.DefaultSelector() as sel:
+                sel.register(pidfd, selectors.EVENT_READ)
+                if not sel.select(timeout=STOP_GRACE_SECONDS):
+                    process.kill()
+        except OSError:
+            pass  # already gone
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
+    
+    def _stream_output(self, process, fd, idle):
+        """Yield the process's output, read from fd, as it arrives until it exits
+        
+        Yields decoded text chunks, None once the output has been idle for
+        idle seconds, and '' as a periodic tick on the fallback path so the
+        caller can check for a stop request. Takes ownership of fd.
+        """
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            # No pidfd (not Linux >= 5.3, or Windows pipes can't be selected);
+            # the reader thread closes fd when it reaches EOF
+            yield from self._queue_output(process, fd, idle)
+            return
+        try:
+            yield from self._select_output(fd, pidfd, idle)
+        finally:
+            os.close(pidfd)
+            os.close(fd)
+    
+    @staticmethod
+    def _select_output(fd, pidfd, idle):
+        """Wait on the output pipe and the child's pidfd together; no polling"""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ, 'out')
+            sel.register(pidfd, selectors.EVENT_READ, 'exit')
+            exited = False
+            output_open = True
+            while not exited:
+                events = sel.select(timeout=idle)
+                if not events:
+                    yield None
+                    continue
+                for key, _ in events:
+                    if key.data == 'exit':
+                        exited = True
+                        continue
+                    try:
+                        data = os.read(fd, PIPE_BUFFER_SIZE)
+                    except OSError:
+                        data = b''
+                    if not data:
+                        # Output closed; keep waiting for the exit itself
+                        sel.unregister(fd)
+                        output_open = False
+                        continue
+                    text = decoder.decode(data)
+                    if text:
+                        yield text.replace('\r\n', '\n')
             
-            # Show idle hint
-            if not self.waiting_for_input:
-                self.show_ready_message()
+            # Drain what is left without blocking on pipes a grandchild may hold open
+            if output_open:
+                os.set_blocking(fd, False)
+                while True:
+                    try:
+                        data = os.read(fd, PIPE_BUFFER_SIZE)
+                    except (BlockingIOError, OSError):
+                        break
+                    if not data:
+                        break
+                    text = decoder.decode(data)
+                    if text:
+                        yield text.replace('\r\n', '\n')
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    
+    def _queue_output(self, process, fd, idle):
+        """Fallback reader: a thread drains the pipe while this side polls a queue"""
+        chunks = queue.Queue()
+        reader = threading.Thread(target=self._pump_stdout, args=(fd, chunks), daemon=True)
+        reader.start()
+        last_output = time.monotonic()
+        while True:
+            try:
+                chunk = chunks.get(timeout=0.1)
+            except queue.Empty:
+                if process.poll() is not None:
+                    # Exited; give the reader a moment to hand over what is left
+                    reader.join(timeout=0.5)
+                    break
+                if time.monotonic() - last_output > idle:
+                    last_output = time.monotonic()
+                    yield None
+                else:
+                    yield ''
+                continue
+            if chunk is None:
+                return
+            last_output = time.monotonic()
+            # Hand over everything already queued in one piece
+            pending, done = self._drain_chunks(chunks, [chunk])
+            yield ''.join(pending)
+            if done:
+                return
+        
+        # Collect anything the reader queued after the child exited
+        pending, _ = self._drain_chunks(chunks, [])
+        if pending:
+            yield ''.join(pending)
+    
+    @staticmethod
+    def _drain_chunks(chunks, pending):
+        """Move queued text onto pending without blocking; return (pending, hit EOF)"""
+        while True:
+            try:
+                chunk = chunks.get_nowait()
+            except queue.Empty:
+                return pending, False
+            if chunk is None:
+                return pending, True
+            pending.append(chunk)
+    
+    @staticmethod
+    def _pump_stdout(fd, chunks):
+        """Forward output read from fd to chunks as it arrives, then None at EOF"""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while True:
+            try:
+                data = os.read(fd, PIPE_BUFFER_SIZE)
+            except OSError:
+                data = b''
+            text = decoder.decode(data, final=not data)
+            if text:
+                chunks.put(text.replace('\r\n', '\n'))
+            if not data:
+                os.close(fd)
+                chunks.put(None)
+                return
     
     def stop_test(self):
         """Stop the running test"""
         if not self.is_running:
             return
         
+        # Ask the program to exit now; the worker escalates to SIGKILL if it
+        # keeps running, and re-enables Run only once it is really gone
         self.is_running = False
         if self.current_process and self.current_process.poll() is None:
             try:
@@ -1016,18 +1483,17 @@ class SandboxTestGUI:
                 self.log_output(f"\n[Warning: Unable to terminate process cleanly: {exc}]\n")
         
         self.stop_button.config(state=tk.DISABLED)
-        self.analyze_run_button.config(state=tk.NORMAL)
         self.waiting_for_input = False
         self.log_output("\n\n⚠ Test stopped by user\n")
         self.result_label.config(text="⚠ Test stopped by user", foreground="#facc15")
         self.update_status("Test stopped")
-        self.show_ready_message()
     
     def clear_output(self, show_ready=True):
         """Clear the output text"""
         # Ensure text widget is editable
         if self.output_text.cget('state') == tk.DISABLED:
             self.output_text.config(state=tk.NORMAL)
+        self._log_queue.clear()
         self.output_text.delete(1.0, tk.END)
         self.result_label.config(text="", foreground="")
         self.input_start_marker = None
@@ -1038,7 +1504,31 @@ class SandboxTestGUI:
             self.show_ready_message()
     
     def log_output(self, text, tag=None):
-        """Add text to output window"""
+        """Add text to output window
+        
+        Safe to call from any thread: fragments are queued and written by
+        _flush_log on the Tk event loop, so bursts of output cost one widget
+        update per flush instead of one per call.
+        """
+        self._log_queue.append((text, tag))
+        self._schedule_flush()
+    
+    def _schedule_flush(self):
+        """Arrange for _flush_log to run once on the Tk event loop"""
+        if not self._log_flush_pending:
+            self._log_flush_pending = True
+            self.root.after(LOG_FLUSH_INTERVAL_MS, self._flush_log)
+    
+    def _flush_log(self):
+        """Write all queued output to the terminal, one insert per run of same-tag text"""
+        # Clear the flag before draining so output queued meanwhile schedules a new flush
+        self._log_flush_pending = False
+        status, self._pending_status = self._pending_status, None
+        if status is not None:
+            self.status_label.config(text=f"Status: {status}")
+        if not self._log_queue:
+            return
+        
         # Ensure text widget is editable
         if self.output_text.cget('state') == tk.DISABLED:
             self.output_text.config(state=tk.NORMAL)
@@ -1046,25 +1536,35 @@ class SandboxTestGUI:
         # If there's a prompt, remove it before adding output
         if self.waiting_for_input and self.input_start_marker:
             try:
-                start_line = self.output_text.index(self.input_start_marker + "-2c")
-                end_line = self.output_text.index(self.input_start_marker)
-                self.output_text.delete(start_line, end_line)
+                self.output_text.delete(PROMPT_MARK, self.input_start_marker)
                 self.input_start_marker = None
                 self.waiting_for_input = False
             except:
                 pass
         
-        if tag:
-            self.output_text.insert(tk.END, text, tag)
-        else:
-            self.output_text.insert(tk.END, text)
+        runs = []
+        while self._log_queue:
+            text, tag = self._log_queue.popleft()
+            if runs and runs[-1][1] == tag:
+                runs[-1][0].append(text)
+            else:
+                runs.append(([text], tag))
+        for parts, tag in runs:
+            if tag:
+                self.output_text.insert(tk.END, "".join(parts), tag)
+            else:
+                self.output_text.insert(tk.END, "".join(parts))
+        
+        # Keep the widget bounded so inserts stay cheap; the prompt's mark moves with the text
+        excess = int(self.output_text.index("end-1c").split(".")[0]) - MAX_TERMINAL_LINES
+        if excess > 0:
+            self.output_text.delete("1.0", f"{excess + 1}.0")
         self.output_text.see(tk.END)
-        self.root.update_idletasks()
     
     def update_status(self, message):
-        """Update status bar"""
-        self.status_label.config(text=f"Status: {message}")
-        self.root.update_idletasks()
+        """Update status bar; like log_output, applied by the next flush"""
+        self._pending_status = message
+        self._schedule_flush()
 
 
 def main():
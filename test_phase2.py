@@ -11,6 +11,7 @@ import subprocess
 import platform
 import re
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 # Colors for output
 if platform.system() == "Windows":
@@ -40,6 +41,14 @@ YELLOW = colorama.Fore.YELLOW
 BLUE = colorama.Fore.BLUE
 RESET = colorama.Fore.RESET
 
+# What the sandbox prints when a limit kicks in, matched once over stdout+stderr
+CPU_LIMIT_RE = re.compile(r"SIGXCPU|CPU time limit exceeded")
+MEMORY_LIMIT_RE = re.compile(r"malloc\(\) failed|killed", re.IGNORECASE)
+HELP_RE = re.compile(r"OPTIONS|(?i:cpu)")
+
+# Free-threaded CPython (3.13t+) runs the per-test threads' Python work in parallel too
+FREE_THREADED = hasattr(sys, "_is_gil_enabled") and not sys._is_gil_enabled()
+
 def get_sandbox_exe():
     """Get the sandbox executable path"""
     if platform.system() == "Windows":
@@ -55,11 +64,10 @@ def get_test_exe(name):
         return f"./tests/{name}"
 
 def run_command(cmd, capture_output=True, timeout=30):
-    """Run a command and return the result"""
+    """Run an argv list directly (no shell) and return the result"""
     try:
         result = subprocess.run(
             cmd,
-            shell=True,
             capture_output=capture_output,
             timeout=timeout,
             text=True
@@ -100,73 +108,79 @@ def main():
     print(f"║        ZenCube Phase 2 - Resource Limit Test Suite          ║")
     print(f"║              Platform: {platform.system():<27} ║")
     print(f"╚═══════════════════════════════════════════════════════════════╝{RESET}\n")
+    if FREE_THREADED:
+        print(f"{BLUE}Free-threaded build detected: sub-tests run without the GIL{RESET}\n")
+    elif hasattr(sys, "_is_gil_enabled"):
+        # 3.13+ with the GIL: the free-threaded build of the same release is available
+        print(f"{YELLOW}Warning: this Python build has the GIL enabled; run under python3.13t "
+              f"so the parallel sub-tests don't contend for it{RESET}\n")
     
-    tests_passed = 0
-    tests_failed = 0
+    # (header, result name, argv, timeout, check(returncode, stdout, stderr))
+    tests = []
     
     # Test 1: CPU Time Limit (only on Unix systems with test programs)
     if has_tests and platform.system() != "Windows":
-        print_header("Test 1: CPU Time Limit (RLIMIT_CPU)")
-        cmd = f'{sandbox_exe} --cpu=3 {get_test_exe("infinite_loop")}'
-        returncode, stdout, stderr = run_command(cmd, timeout=10)
-        output = stdout + stderr
-        if "SIGXCPU" in output or "CPU time limit exceeded" in output:
-            if print_result("CPU limit enforcement", True):
-                tests_passed += 1
-        else:
-            if print_result("CPU limit enforcement", False):
-                tests_failed += 1
-            print(f"  Output: {output[:200]}...")
+        tests.append((
+            "Test 1: CPU Time Limit (RLIMIT_CPU)", "CPU limit enforcement",
+            [sandbox_exe, '--cpu=3', get_test_exe("infinite_loop")], 10,
+            lambda returncode, stdout, stderr: bool(CPU_LIMIT_RE.search(stdout + stderr)),
+        ))
     
     # Test 2: Memory Limit (only on Unix systems with test programs)
     if has_tests and platform.system() != "Windows":
-        print_header("Test 2: Memory Limit (RLIMIT_AS)")
-        cmd = f'{sandbox_exe} --mem=100 {get_test_exe("memory_hog")}'
-        returncode, stdout, stderr = run_command(cmd, timeout=10)
-        output = stdout + stderr
-        if "malloc() failed" in output or "killed" in output or returncode != 0:
-            if print_result("Memory limit enforcement", True):
-                tests_passed += 1
-        else:
-            if print_result("Memory limit enforcement", False):
-                tests_failed += 1
+        tests.append((
+            "Test 2: Memory Limit (RLIMIT_AS)", "Memory limit enforcement",
+            [sandbox_exe, '--mem=100', get_test_exe("memory_hog")], 10,
+            lambda returncode, stdout, stderr: bool(MEMORY_LIMIT_RE.search(stdout + stderr)) or returncode != 0,
+        ))
     
     # Test 3: Normal Process (No Limits)
-    print_header("Test 3: Normal Process Execution (No Limits)")
     if platform.system() == "Windows":
-        cmd = f'{sandbox_exe} cmd /c echo "Test"'
-    else:
-        cmd = f'{sandbox_exe} /bin/ls'
-    
-    returncode, stdout, stderr = run_command(cmd)
-    if print_result("Normal execution without limits", returncode == 0):
-        tests_passed += 1
+        cmd = [sandbox_exe, 'cmd', '/c', 'echo', 'Test']
     else:
-        tests_failed += 1
+        cmd = [sandbox_exe, '/bin/ls']
+    tests.append((
+        "Test 3: Normal Process Execution (No Limits)", "Normal execution without limits",
+        cmd, 30,
+        lambda returncode, stdout, stderr: returncode == 0,
+    ))
     
     # Test 4: Help and Usage
-    print_header("Test 4: Help and Command-Line Interface")
-    cmd = f'{sandbox_exe} --help'
-    returncode, stdout, stderr = run_command(cmd)
-    if "OPTIONS" in stdout or "cpu" in stdout.lower():
-        if print_result("Help message displays correctly", True):
-            tests_passed += 1
-    else:
-        if print_result("Help message displays correctly", False):
-            tests_failed += 1
+    tests.append((
+        "Test 4: Help and Command-Line Interface", "Help message displays correctly",
+        [sandbox_exe, '--help'], 30,
+        lambda returncode, stdout, stderr: bool(HELP_RE.search(stdout)),
+    ))
     
     # Test 5: Invalid Arguments
-    print_header("Test 5: Error Handling")
     if platform.system() == "Windows":
-        cmd = f'{sandbox_exe} --cpu=-5 cmd /c echo test'
+        cmd = [sandbox_exe, '--cpu=-5', 'cmd', '/c', 'echo', 'test']
     else:
-        cmd = f'{sandbox_exe} --cpu=-5 /bin/ls'
+        cmd = [sandbox_exe, '--cpu=-5', '/bin/ls']
+    tests.append((
+        "Test 5: Error Handling", "Invalid argument detection",
+        cmd, 30,
+        lambda returncode, stdout, stderr: returncode != 0,
+    ))
     
-    returncode, stdout, stderr = run_command(cmd)
-    if print_result("Invalid argument detection", returncode != 0):
-        tests_passed += 1
-    else:
-        tests_failed += 1
+    # One thread per test: each spends its time blocked on its own child, so
+    # more threads than tests wouldn't help even on a free-threaded build
+    with ThreadPoolExecutor(max_workers=len(tests)) as pool:
+        futures = [pool.submit(run_command, cmd, timeout=timeout)
+                   for _, _, cmd, timeout, _ in tests]
+        results = [future.result() for future in futures]
+    
+    tests_passed = 0
+    tests_failed = 0
+    for (header, name, _, _, check), (returncode, stdout, stderr) in zip(tests, results):
+        print_header(header)
+        if print_result(name, check(returncode, stdout, stderr)):
+            tests_passed += 1
+        else:
+            tests_failed += 1
+            output = stdout + stderr
+            if output:
+                print(f"  Output: {output[:200]}...")
     
     # Summary
     print(f"\n{YELLOW}{'=' * 60}{RESET}")
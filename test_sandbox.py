@@ -9,6 +9,8 @@ import sys
 import os
 import subprocess
 import platform
+import re
+from concurrent.futures import ThreadPoolExecutor
 
 # Colors for output
 if platform.system() == "Windows":
@@ -38,6 +40,9 @@ YELLOW = colorama.Fore.YELLOW
 BLUE = colorama.Fore.BLUE
 RESET = colorama.Fore.RESET
 
+# What --help output must mention
+HELP_RE = re.compile(r"OPTIONS|(?i:cpu)")
+
 def get_sandbox_exe():
     """Get the sandbox executable path"""
     if platform.system() == "Windows":
@@ -53,11 +58,10 @@ def get_test_exe(name):
         return f"./tests/{name}"
 
 def run_command(cmd, capture_output=True, timeout=30):
-    """Run a command and return the result"""
+    """Run an argv list directly (no shell) and return the result"""
     try:
         result = subprocess.run(
             cmd,
-            shell=True,
             capture_output=capture_output,
             timeout=timeout,
             text=True
@@ -98,82 +102,71 @@ def main():
     print(f"║              Platform: {platform.system():<27} ║")
     print(f"╚═══════════════════════════════════════════════════════════════╝{RESET}\n")
     
-    tests_passed = 0
-    tests_failed = 0
+    # Laid out as in test_phase2.py; results are printed in list order
+    tests = []
+    windows = platform.system() == "Windows"
     
     # Test 1: Basic command execution
-    print_header("Test 1: Basic Command Execution")
-    if platform.system() == "Windows":
-        cmd = f'{sandbox_exe} cmd /c echo "Hello from ZenCube!"'
-    else:
-        cmd = f'{sandbox_exe} /bin/echo "Hello from ZenCube!"'
-    
-    returncode, stdout, stderr = run_command(cmd)
-    if print_result("Basic execution", returncode == 0):
-        tests_passed += 1
-    else:
-        tests_failed += 1
-        print(f"  Output: {stdout}")
-        print(f"  Error: {stderr}")
+    tests.append((
+        "Test 1: Basic Command Execution", "Basic execution",
+        [sandbox_exe, 'cmd', '/c', 'echo', 'Hello from ZenCube!'] if windows
+        else [sandbox_exe, '/bin/echo', 'Hello from ZenCube!'], 30,
+        lambda returncode, stdout, stderr: returncode == 0,
+    ))
     
     # Test 2: Command with arguments
-    print_header("Test 2: Command with Arguments")
-    if platform.system() == "Windows":
-        cmd = f'{sandbox_exe} cmd /c dir'
-    else:
-        cmd = f'{sandbox_exe} /bin/ls -la'
-    
-    returncode, stdout, stderr = run_command(cmd)
-    if print_result("Arguments test", returncode == 0):
-        tests_passed += 1
-    else:
-        tests_failed += 1
+    tests.append((
+        "Test 2: Command with Arguments", "Arguments test",
+        [sandbox_exe, 'cmd', '/c', 'dir'] if windows else [sandbox_exe, '/bin/ls', '-la'], 30,
+        lambda returncode, stdout, stderr: returncode == 0,
+    ))
     
     # Test 3: Timing functionality
-    print_header("Test 3: Timing Functionality")
-    if platform.system() == "Windows":
-        cmd = f'{sandbox_exe} timeout /t 1 /nobreak'
-    else:
-        cmd = f'{sandbox_exe} /bin/sleep 1'
-    
-    returncode, stdout, stderr = run_command(cmd, timeout=5)
-    if print_result("Timing test", returncode == 0):
-        tests_passed += 1
-    else:
-        tests_failed += 1
+    tests.append((
+        "Test 3: Timing Functionality", "Timing test",
+        [sandbox_exe, 'timeout', '/t', '1', '/nobreak'] if windows else [sandbox_exe, '/bin/sleep', '1'], 5,
+        lambda returncode, stdout, stderr: returncode == 0,
+    ))
     
     # Test 4: Error handling - invalid command
-    print_header("Test 4: Error Handling")
-    if platform.system() == "Windows":
-        cmd = f'{sandbox_exe} nonexistent_command.exe'
-    else:
-        cmd = f'{sandbox_exe} /nonexistent/command'
-    
-    returncode, stdout, stderr = run_command(cmd)
-    if print_result("Error handling", returncode != 0):
-        tests_passed += 1
-    else:
-        tests_failed += 1
+    tests.append((
+        "Test 4: Error Handling", "Error handling",
+        [sandbox_exe, 'nonexistent_command.exe'] if windows else [sandbox_exe, '/nonexistent/command'], 30,
+        lambda returncode, stdout, stderr: returncode != 0,
+    ))
     
     # Test 5: Help message
-    print_header("Test 5: Help and Usage Information")
-    cmd = f'{sandbox_exe} --help'
-    returncode, stdout, stderr = run_command(cmd)
-    if "OPTIONS" in stdout or "cpu" in stdout.lower():
-        if print_result("Help message", True):
-            tests_passed += 1
-    else:
-        if print_result("Help message", False):
-            tests_failed += 1
+    tests.append((
+        "Test 5: Help and Usage Information", "Help message",
+        [sandbox_exe, '--help'], 30,
+        lambda returncode, stdout, stderr: bool(HELP_RE.search(stdout)),
+    ))
     
     # Test 6: No arguments
-    print_header("Test 6: No Arguments Error Handling")
-    cmd = f'{sandbox_exe}'
-    returncode, stdout, stderr = run_command(cmd)
-    if print_result("No arguments test", returncode != 0):
-        tests_passed += 1
-    else:
-        tests_failed += 1
+    tests.append((
+        "Test 6: No Arguments Error Handling", "No arguments test",
+        [sandbox_exe], 30,
+        lambda returncode, stdout, stderr: returncode != 0,
+    ))
+    
+    # Every test keeps its own timeout, so a hung one can't stall the rest
+    with ThreadPoolExecutor(max_workers=len(tests)) as pool:
+        futures = [pool.submit(run_command, cmd, timeout=timeout)
+                   for _, _, cmd, timeout, _ in tests]
+        results = [future.result() for future in futures]
+    
+    tests_passed = 0
+    tests_failed = 0
+    for (header, name, _, _, check), (returncode, stdout, stderr) in zip(tests, results):
+        print_header(header)
+        if print_result(name, check(returncode, stdout, stderr)):
+            tests_passed += 1
+        else:
+            tests_failed += 1
+            if stdout:
+                print(f"  Output: {stdout}")
+            if stderr:
+                print(f"  Error: {stderr}")
     
     # Summary
     print(f"\n{YELLOW}{'=' * 60}{RESET}")
@@ -4,55 +4,173 @@ ZenCube Web Dashboard
 Flask-based web interface with real-time monitoring
 """
 
-from flask import Flask, render_template, jsonify, request, send_from_directory
+import os
+
+# Optional: eventlet replaces the Werkzeug dev server with its own WSGI
+# server; it has to patch the standard library before anything else loads.
+# Vercel runs the app through its own server, so keep threading there.
+ASYNC_MODE = 'threading'
+if not os.environ.get('VERCEL'):
+    try:
+        import eventlet
+        eventlet.monkey_patch()
+        ASYNC_MODE = 'eventlet'
+    except ImportError:
+        pass
+
+from flask import Flask, Request, render_template, jsonify, request, send_from_directory
 from werkzeug.utils import secure_filename
 from flask_socketio import SocketIO, emit
 import subprocess
 import threading
-import os
 import json
 import time
 import platform
 import psutil
+import queue
 import tempfile
 import shutil
 import uuid
 import shlex
+import signal
+import stat
+import re
+import select
+import selectors
+import codecs
+import functools
+import hashlib
+import io
+import sys
+from contextlib import contextmanager
 from pathlib import Path
-from code_analyzer import CodeAnalyzer
+from code_analyzer import CodeAnalyzer, analyze_in_pool, start_analysis_pool
+
+# Optional: orjson encodes Socket.IO packets several times faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Uploads up to this size are parsed into memory; larger ones into a real
+# temporary file, which save_upload can hand to sendfile
+UPLOAD_SPOOL_BYTES = 1024 * 1024
+
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        """Werkzeug's hook for where an uploaded file is buffered while parsing"""
+        if total_content_length is not None and total_content_length <= UPLOAD_SPOOL_BYTES:
+            return io.BytesIO()
+        return tempfile.TemporaryFile('rb+')
+
+
+class OrjsonCodec:
+    """Socket.IO json codec backed by orjson
+    
+    The packet encoder expects a str from dumps and passes compact
+    separators, which are already orjson's only output format.
+    """
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    @staticmethod
+    def loads(data, **kwargs):
+        return orjson.loads(data)
+
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
+app.request_class = UploadRequest
 app.config['SECRET_KEY'] = 'zencube-secret-key-2025'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 # Configure SocketIO for Vercel compatibility (use polling as fallback)
 socketio = SocketIO(
     app, 
     cors_allowed_origins="*", 
-    async_mode='threading',
+    async_mode=ASYNC_MODE,
+    json=OrjsonCodec if orjson else None,  # None: the stdlib json module
     allow_upgrades=True,
     transports=['polling', 'websocket']
 )
 
+# Output is sent to clients in batches: whichever comes first of this many
+# bytes or this long after the first unsent byte arrived
+OUTPUT_FLUSH_BYTES = 4096
+OUTPUT_FLUSH_SECONDS = 0.05
+# Per-process updates (output, resource stats, completion) are queued and
+# sent together as one 'batch' event this often
+EMIT_FLUSH_SECONDS = 0.033
+
 # Global state
+# Request handlers and the per-process tasks all touch these; hold PROC_LOCK
+# for any change or iteration (but not while waiting on a process)
 running_processes = {}
 monitoring_threads = {}
+PROC_LOCK = threading.RLock()
+# process_id -> [[event, data], ...] awaiting the next batch; guarded by EMIT_LOCK
+pending_updates = {}
+emit_flusher_running = False
+EMIT_LOCK = threading.Lock()
 # Use /tmp on Vercel (read-only filesystem), otherwise use 'uploads'
 UPLOAD_DIR = Path('/tmp/zencube_uploads' if os.environ.get('VERCEL') else 'uploads')
+# Resolved once so is_within_uploads does not walk UPLOAD_DIR on every call
+UPLOAD_DIR_RESOLVED = UPLOAD_DIR.resolve()
+# Compiled uploads, one directory per (compiler, version, source content);
+# the least recently used are dropped once the total passes the cap
+BUILD_CACHE_DIR = UPLOAD_DIR / 'build_cache'
+BUILD_CACHE_MAX_BYTES = 200 * 1024 * 1024
+EVICT_LOCK = threading.Lock()
 
 
 def ensure_upload_dir():
     """Ensure the uploads directory exists"""
+    global UPLOAD_DIR_RESOLVED
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    # The directory may be a symlink created after import
+    UPLOAD_DIR_RESOLVED = UPLOAD_DIR.resolve()
 
 
 def is_within_uploads(path: Path) -> bool:
     """Check if a path is inside the uploads directory"""
     try:
-        return UPLOAD_DIR.resolve() in path.resolve().parents or path.resolve() == UPLOAD_DIR.resolve()
-    except FileNotFoundError:
+        return path.resolve().is_relative_to(UPLOAD_DIR_RESOLVED)
+    except (FileNotFoundError, ValueError):
         return False
 
 
+def save_upload(file_storage, destination):
+    """Write an uploaded file to destination
+    
+    On Linux a file-backed upload is copied in the kernel with sendfile;
+    in-memory ones, and other platforms, go through copyfileobj.
+    """
+    src = file_storage.stream
+    with open(destination, 'wb') as dst:
+        if sys.platform.startswith('linux'):
+            try:
+                src_fd = src.fileno()
+            except (AttributeError, OSError):
+                src_fd = None
+            if src_fd is not None:
+                size = os.fstat(src_fd).st_size
+                offset = 0
+                try:
+                    while offset < size:
+                        sent = os.sendfile(dst.fileno(), src_fd, offset, size - offset)
+                        if not sent:
+                            break
+                        offset += sent
+                    return
+                except OSError:
+                    # e.g. a filesystem without sendfile support; start over
+                    dst.seek(0)
+                    dst.truncate()
+        src.seek(0)
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
 def save_uploaded_file(file_storage):
     """Persist an uploaded file and return its path"""
     ensure_upload_dir()
@@ -60,15 +178,17 @@ def save_uploaded_file(file_storage):
     suffix = Path(original_name).suffix
     unique_name = f"{Path(original_name).stem}_{uuid.uuid4().hex}{suffix}"
     destination = UPLOAD_DIR / unique_name
-    file_storage.save(destination)
+    save_upload(file_storage, destination)
     return destination
 
 
 def cleanup_process_resources(process_id):
     """Remove uploaded/temporary files linked to a process"""
-    info = running_processes.pop(process_id, None)
+    with PROC_LOCK:
+        info = running_processes.pop(process_id, None)
     if not info:
         return
+    info['input_queue'].put(None)  # stop the input writer
 
     cleanup_paths = info.get('cleanup_paths', [])
     uploaded_file = info.get('uploaded_file')
@@ -95,6 +215,24 @@ def cleanup_process_resources(process_id):
             pass
 
 
+# Command prefix that runs a script, by extension (None: unsupported here)
+INTERPRETER_MAP = {
+    '.py': ['python3'] if os.name != 'nt' else ['python'],
+    '.sh': ['bash'],
+    '.js': ['node'],
+    '.rb': ['ruby'],
+    '.pl': ['perl'],
+    '.ps1': ['pwsh'] if os.name != 'nt' else ['powershell'],
+    '.bat': ['cmd.exe', '/c'] if os.name == 'nt' else None,
+}
+
+# PATH lookups for interpreters, which don't move while the server runs
+_which = functools.lru_cache(maxsize=32)(shutil.which)
+
+# A Java package declaration; only the head of the source is searched
+PACKAGE_RE = re.compile(rb'^\s*package\s+([\w.]+)\s*;', re.MULTILINE)
+
+
 def build_execution_command(file_path: Path):
     """Determine how to execute a file and return command parts + cleanup paths"""
     if not file_path.exists():
@@ -103,86 +241,174 @@ def build_execution_command(file_path: Path):
     cleanup_paths = []
     ext = file_path.suffix.lower()
 
-    interpreter_map = {
-        '.py': ['python3'] if os.name != 'nt' else ['python'],
-        '.sh': ['bash'],
-        '.js': ['node'],
-        '.rb': ['ruby'],
-        '.pl': ['perl'],
-        '.ps1': ['pwsh'] if os.name != 'nt' else ['powershell'],
-        '.bat': ['cmd.exe', '/c'] if os.name == 'nt' else None,
-    }
-
     # Allow executables
-    if os.access(file_path, os.X_OK) and ext not in interpreter_map:
+    if os.access(file_path, os.X_OK) and ext not in INTERPRETER_MAP:
         return [str(file_path)], cleanup_paths
 
-    if ext in interpreter_map and interpreter_map[ext]:
-        interpreter_cmd = interpreter_map[ext]
-        if shutil.which(interpreter_cmd[0]) is None:
+    interpreter_cmd = INTERPRETER_MAP.get(ext)
+    if interpreter_cmd:
+        if _which(interpreter_cmd[0]) is None:
             raise RuntimeError(f"Required interpreter '{interpreter_cmd[0]}' not found on PATH.")
         return interpreter_cmd + [str(file_path)], cleanup_paths
 
-    if ext in ('.c',):
-        ensure_upload_dir()
-        build_dir = UPLOAD_DIR / f"build_{uuid.uuid4().hex}"
-        build_dir.mkdir(parents=True, exist_ok=True)
-        output_name = file_path.stem + ('.exe' if os.name == 'nt' else '')
-        output_path = build_dir / output_name
-        compile_cmd = ['gcc', str(file_path), '-o', str(output_path)]
-        result = subprocess.run(compile_cmd, capture_output=True, text=True, timeout=60)
-        if result.returncode != 0:
-            raise RuntimeError(f"C compilation failed:\n{result.stderr or result.stdout}")
-        if os.name != 'nt':
-            os.chmod(output_path, 0o755)
-        cleanup_paths.append(str(build_dir))
-        return [str(output_path)], cleanup_paths
+    if ext == '.c':
+        build_dir = compile_cached(file_path, 'gcc', "C")
+        return [str(build_dir / EXECUTABLE_NAME)], cleanup_paths
 
     if ext in ('.cpp', '.cc', '.cxx'):
-        ensure_upload_dir()
-        build_dir = UPLOAD_DIR / f"build_{uuid.uuid4().hex}"
-        build_dir.mkdir(parents=True, exist_ok=True)
-        output_name = file_path.stem + ('.exe' if os.name == 'nt' else '')
-        output_path = build_dir / output_name
-        compile_cmd = ['g++', str(file_path), '-o', str(output_path)]
-        result = subprocess.run(compile_cmd, capture_output=True, text=True, timeout=60)
-        if result.returncode != 0:
-            raise RuntimeError(f"C++ compilation failed:\n{result.stderr or result.stdout}")
-        if os.name != 'nt':
-            os.chmod(output_path, 0o755)
-        cleanup_paths.append(str(build_dir))
-        return [str(output_path)], cleanup_paths
+        build_dir = compile_cached(file_path, 'g++', "C++")
+        return [str(build_dir / EXECUTABLE_NAME)], cleanup_paths
 
     if ext == '.java':
-        ensure_upload_dir()
-        build_dir = UPLOAD_DIR / f"build_{uuid.uuid4().hex}"
-        build_dir.mkdir(parents=True, exist_ok=True)
-        compile_cmd = ['javac', '-d', str(build_dir), str(file_path)]
-        result = subprocess.run(compile_cmd, capture_output=True, text=True, timeout=60)
-        if result.returncode != 0:
-            raise RuntimeError(f"Java compilation failed:\n{result.stderr or result.stdout}")
+        build_dir = compile_cached(file_path, 'javac', "Java")
         package_name = None
         try:
-            with file_path.open('r', encoding='utf-8', errors='ignore') as src:
-                for line in src:
-                    stripped = line.strip()
-                    if stripped.startswith('package '):
-                        package_name = stripped.split('package', 1)[1].strip().rstrip(';')
-                        break
+            with file_path.open('rb') as src:
+                match = PACKAGE_RE.search(src.read(4096))
+            if match:
+                package_name = match.group(1).decode('ascii')
         except Exception:
             package_name = None
 
         class_name = file_path.stem
         fqcn = f"{package_name}.{class_name}" if package_name else class_name
-        cleanup_paths.append(str(build_dir))
         return ['java', '-cp', str(build_dir), fqcn], cleanup_paths
 
     raise ValueError(f"Unsupported file type: {file_path.suffix}")
 
 
+# Uploads carry a unique suffix, so cached C/C++ builds use a fixed name
+EXECUTABLE_NAME = 'program.exe' if os.name == 'nt' else 'program'
+# Local headers a C/C++ source may include, tracked in its build's cache key
+HEADER_EXTS = ('.h', '.hh', '.hpp', '.hxx')
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_version(compiler):
+    """Return the compiler's version banner (queried once per process)"""
+    flag = '-version' if compiler == 'javac' else '--version'
+    try:
+        result = subprocess.run([compiler, flag], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    return result.stdout.strip().split("\n", 1)[0]
+
+
+def run_compiler(compile_cmd, timeout):
+    """Run a compiler and return its CompletedProcess
+    
+    communicate() already blocks in poll() on the output pipes, so there is
+    no polling to remove here, and SIGALRM is not an option off the main
+    thread. What this adds over subprocess.run is the process group: on
+    POSIX the compiler gets its own session, and a timeout kills the whole
+    group, including cc1/ld or javac's forks, not just the driver.
+    """
+    new_session = os.name != 'nt'
+    with subprocess.Popen(compile_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          text=True, start_new_session=new_session) as proc:
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            if new_session:
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            else:
+                proc.kill()
+            proc.communicate()
+            raise
+    return subprocess.CompletedProcess(compile_cmd, proc.returncode, stdout, stderr)
+
+
+def local_headers_state(source_dir: Path):
+    """Return (name, mtime_ns, size) for the headers in source_dir, sorted by name"""
+    state = []
+    try:
+        with os.scandir(source_dir) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(HEADER_EXTS) and entry.is_file():
+                    st = entry.stat()
+                    state.append((entry.name, st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    return sorted(state)
+
+
+def compile_cached(file_path: Path, compiler, language):
+    """Compile file_path with compiler and return its build directory
+    
+    Builds are cached by source content, so re-submitting the same file
+    skips the compiler. The directory is shared and must not be cleaned up.
+    For a C/C++ source outside the uploads directory (a manual-path run),
+    the headers next to it are part of the key as well; uploads are saved
+    under unique names, so they can't include one another.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{compiler}|{compiler_version(compiler)}|{os.name}|".encode())
+    if compiler != 'javac' and not is_within_uploads(file_path):
+        digest.update(repr(local_headers_state(file_path.parent)).encode())
+    digest.update(file_path.read_bytes())
+    cache_dir = BUILD_CACHE_DIR / f"{compiler}_{digest.hexdigest()}"
+    if cache_dir.is_dir():
+        os.utime(cache_dir)  # mark as recently used
+        return cache_dir
+
+    # Build into a scratch directory and move it into place only on success
+    BUILD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    build_dir = Path(tempfile.mkdtemp(dir=BUILD_CACHE_DIR, prefix='tmp_'))
+    try:
+        if compiler == 'javac':
+            compile_cmd = ['javac', '-d', str(build_dir), str(file_path)]
+        else:
+            compile_cmd = [compiler, str(file_path), '-o', str(build_dir / EXECUTABLE_NAME)]
+        result = run_compiler(compile_cmd, timeout=60)
+        if result.returncode != 0:
+            raise RuntimeError(f"{language} compilation failed:\n{result.stderr or result.stdout}")
+        if compiler != 'javac' and os.name != 'nt':
+            os.chmod(build_dir / EXECUTABLE_NAME, 0o755)
+        try:
+            os.replace(build_dir, cache_dir)
+        except OSError:
+            # A concurrent request cached the same build first
+            if not cache_dir.is_dir():
+                raise
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    # Sizing the cache walks every cached file; keep that off the request
+    socketio.start_background_task(evict_build_cache, keep=cache_dir)
+    return cache_dir
+
+
+def evict_build_cache(keep=None):
+    """Remove the least recently used builds until the cache fits BUILD_CACHE_MAX_BYTES"""
+    # Each new build starts a pass; one at a time, so none sizes an entry
+    # another is deleting
+    with EVICT_LOCK:
+        entries = []
+        total = 0
+        for entry in BUILD_CACHE_DIR.iterdir():
+            if entry.name.startswith('tmp_') or not entry.is_dir():
+                continue  # builds still in progress
+            try:
+                size = sum(f.stat().st_size for f in entry.rglob('*') if f.is_file())
+                entries.append((entry.stat().st_mtime, size, entry))
+            except FileNotFoundError:
+                continue  # replaced or removed meanwhile
+            total += size
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= BUILD_CACHE_MAX_BYTES:
+                break
+            if entry != keep:
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+
+
 def launch_sandbox_process(command_parts, limits, metadata):
     """Launch sandbox with computed command parts"""
-    sandbox_path = find_sandbox()
+    sandbox_path = resolve_sandbox()
     if not sandbox_path:
         raise RuntimeError('Sandbox executable not found')
 
@@ -206,46 +432,49 @@ def launch_sandbox_process(command_parts, limits, metadata):
 
     process_id = f"proc_{uuid.uuid4().hex}"
 
+    # On POSIX, CPython launches with posix_spawn (no fork of this process) only
+    # without close_fds, pass_fds, cwd, preexec_fn or a new session. Python's
+    # own descriptors are non-inheritable already, so nothing leaks by
+    # leaving close_fds off; Windows keeps its default handle list.
+    # The pipes are binary: output is read from the raw fd and decoded by
+    # stream_process_output, and input is encoded by handle_send_input.
     proc = subprocess.Popen(
         full_cmd,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         stdin=subprocess.PIPE,
-        text=True,
-        bufsize=1
+        close_fds=os.name == 'nt'
     )
 
-    running_processes[process_id] = {
-        'process': proc,
-        'pid': proc.pid,
-        'command': ' '.join(full_cmd),
-        'start_time': time.time(),
-        'stdin': proc.stdin,
-        'uploaded_file': metadata.get('uploaded_file'),
-        'cleanup_paths': metadata.get('cleanup_paths', [])
-    }
+    # Registered and started under the lock, so neither task can finish and
+    # clean up before its entries exist
+    # Input is written by its own task so a child that stops reading stdin
+    # can't stall the SocketIO handler that received it
+    input_queue = queue.Queue()
+    with PROC_LOCK:
+        running_processes[process_id] = {
+            'process': proc,
+            'pid': proc.pid,
+            'command': ' '.join(full_cmd),
+            'start_time': time.time(),
+            'input_queue': input_queue,
+            'uploaded_file': metadata.get('uploaded_file'),
+            'cleanup_paths': metadata.get('cleanup_paths', [])
+        }
 
-    # Start monitoring thread
-    monitor_thread = threading.Thread(
-        target=monitor_process,
-        args=(proc.pid, process_id),
-        daemon=True
-    )
-    monitoring_threads[process_id] = monitor_thread
-    monitor_thread.start()
-
-    # Start streaming output
-    output_thread = threading.Thread(
-        target=stream_process_output,
-        args=(proc, process_id),
-        daemon=True
-    )
-    output_thread.start()
+        # Monitor and stream as SocketIO background tasks: green threads on the
+        # eventlet hub, or daemon threads in threading mode
+        monitoring_threads[process_id] = socketio.start_background_task(monitor_process, proc.pid, process_id)
+
+        # Start streaming output
+        socketio.start_background_task(stream_process_output, proc, process_id)
+        socketio.start_background_task(feed_process_input, proc, input_queue)
 
     return process_id, proc.pid
 
+@functools.lru_cache(maxsize=1)
 def find_sandbox():
-    """Find sandbox executable"""
+    """Find sandbox executable (memoized; see resolve_sandbox)"""
     script_dir = os.path.dirname(os.path.abspath(__file__))
     paths = [
         os.path.join(script_dir, "sandbox"),
@@ -269,69 +498,222 @@ def find_sandbox():
             except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.CalledProcessError):
                 pass  # Silently fail if can't remove
     
+    # One stat per candidate covers both existence and the execute bits
     for path in paths:
         full_path = os.path.abspath(path)
-        if os.path.exists(full_path):
-            if os.name != 'nt':
-                if os.access(full_path, os.X_OK):
-                    remove_quarantine_if_needed(full_path)
-                    return full_path
-            else:
-                return full_path
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            continue
+        if os.name == 'nt':
+            return full_path
+        if st.st_mode & 0o111:
+            remove_quarantine_if_needed(full_path)
+            return full_path
     return None
 
+def resolve_sandbox():
+    """Return the memoized sandbox path, searching again if it has gone missing
+    
+    Nothing found is retried too, so a sandbox built after startup is picked up.
+    """
+    path = find_sandbox()
+    if path is None or not os.path.exists(path):
+        find_sandbox.cache_clear()
+        path = find_sandbox()
+    return path
+
+# Search (and clear macOS quarantine) once at import, not on the first run request
+find_sandbox()
+
+@contextmanager
+def process_exit_waiter(proc):
+    """Yield wait(timeout) -> True once proc has exited, for pacing a monitor loop
+    
+    Blocks on a pidfd (Linux) or a kqueue NOTE_EXIT filter (macOS/BSD), so the
+    exit wakes the caller at once instead of being found by polling; either fd
+    goes through selectors so it stays cooperative under eventlet. Elsewhere
+    it falls back to sleeping and asking psutil.
+    """
+    handle = None
+    # OSError: already gone, or no permission to watch it
+    if hasattr(os, 'pidfd_open'):
+        try:
+            handle = os.pidfd_open(proc.pid)
+        except OSError:
+            pass
+    elif hasattr(select, 'kqueue'):
+        kq = select.kqueue()
+        try:
+            kq.control([select.kevent(proc.pid, select.KQ_FILTER_PROC,
+                                      select.KQ_EV_ADD, select.KQ_NOTE_EXIT)], 0)
+            handle = kq
+        except OSError:
+            kq.close()
+
+    if handle is None:
+        def wait(timeout):
+            time.sleep(timeout)
+            return not proc.is_running()
+        yield wait
+        return
+
+    sel = selectors.DefaultSelector()
+    sel.register(handle if isinstance(handle, int) else handle.fileno(), selectors.EVENT_READ)
+    try:
+        yield lambda timeout: bool(sel.select(timeout))
+    finally:
+        sel.close()
+        if isinstance(handle, int):
+            os.close(handle)
+        else:
+            handle.close()
+
+
+def queue_update(process_id, event, data):
+    """Queue an update for the process's clients, sent with the next batch
+    
+    Consecutive output chunks are joined into one update. The flusher is
+    started on demand and stops once nothing is queued or running.
+    """
+    global emit_flusher_running
+    with EMIT_LOCK:
+        updates = pending_updates.setdefault(process_id, [])
+        if event == 'output' and updates and updates[-1][0] == 'output':
+            updates[-1][1]['chunk'] += data['chunk']
+        else:
+            updates.append([event, data])
+        if not emit_flusher_running:
+            emit_flusher_running = True
+            socketio.start_background_task(flush_updates)
+
+
+def flush_updates():
+    """Emit the queued updates every EMIT_FLUSH_SECONDS as one 'batch' event"""
+    global pending_updates, emit_flusher_running
+    while True:
+        socketio.sleep(EMIT_FLUSH_SECONDS)
+        with EMIT_LOCK:
+            batch, pending_updates = pending_updates, {}
+            if not batch and not running_processes:
+                emit_flusher_running = False
+                return
+        if batch:
+            socketio.emit('batch', batch)
+
+
 def monitor_process(pid, process_id):
     """Monitor a process and send updates via WebSocket"""
     try:
         proc = psutil.Process(pid)
         start_time = time.time()
+        # The first reading only starts the measurement window
+        proc.cpu_percent(interval=None)
+        # num_fds is a single directory read, not a readlink per descriptor
+        # like open_files(); Windows has no fd count, so it reports 0 there
+        sample_attrs = ['cpu_percent', 'memory_info', 'num_threads']
+        if hasattr(proc, 'num_fds'):
+            sample_attrs.append('num_fds')
         
-        while proc.is_running() and process_id in running_processes:
-            try:
-                cpu_percent = proc.cpu_percent(interval=0.1)
-                memory_info = proc.memory_info()
-                memory_mb = memory_info.rss / 1024 / 1024
-                # Use vms instead of vss - vms is available on macOS/Linux, vss is not standard
-                virtual_mb = getattr(memory_info, 'vms', memory_info.rss) / 1024 / 1024
-                num_threads = proc.num_threads()
-                num_fds = len(proc.open_files()) if hasattr(proc, 'open_files') else 0
+        with process_exit_waiter(proc) as exited:
+            while process_id in running_processes and not exited(0.5):  # Update every 500ms
+                try:
+                    # One kernel query per tick: oneshot() caches it for every field
+                    with proc.oneshot():
+                        info = proc.as_dict(attrs=sample_attrs)
+                    if info['memory_info'] is None:
+                        break  # as_dict turns NoSuchProcess/AccessDenied into None
+                    cpu_percent = info['cpu_percent'] or 0.0
+                    memory_info = info['memory_info']
+                    memory_mb = memory_info.rss / 1024 / 1024
+                    # Use vms instead of vss - vms is available on macOS/Linux, vss is not standard
+                    virtual_mb = getattr(memory_info, 'vms', memory_info.rss) / 1024 / 1024
+                    num_threads = info['num_threads'] or 0
+                    num_fds = info.get('num_fds') or 0
                 
-                elapsed = time.time() - start_time
+                    elapsed = time.time() - start_time
                 
-                stats = {
-                    'process_id': process_id,
-                    'cpu_percent': round(cpu_percent, 2),
-                    'memory_mb': round(memory_mb, 2),
-                    'virtual_memory_mb': round(virtual_mb, 2),
-                    'threads': num_threads,
-                    'file_descriptors': num_fds,
-                    'elapsed_time': round(elapsed, 2),
-                    'timestamp': time.time()
-                }
+                    stats = {
+                        'process_id': process_id,
+                        'cpu_percent': round(cpu_percent, 2),
+                        'memory_mb': round(memory_mb, 2),
+                        'virtual_memory_mb': round(virtual_mb, 2),
+                        'threads': num_threads,
+                        'file_descriptors': num_fds,
+                        'elapsed_time': round(elapsed, 2),
+                        'timestamp': time.time()
+                    }
                 
-                socketio.emit('resource_update', stats)
-                time.sleep(0.5)  # Update every 500ms
+                    queue_update(process_id, 'resource_update', stats)
                 
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                break
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    break
                 
     except Exception as e:
         socketio.emit('error', {'message': f'Monitoring error: {str(e)}'})
     finally:
-        if process_id in monitoring_threads:
-            del monitoring_threads[process_id]
+        with PROC_LOCK:
+            monitoring_threads.pop(process_id, None)
+
+
+def read_output_batches(fd):
+    """Yield the bytes read from fd in batches until EOF
+    
+    A batch is sent once it reaches OUTPUT_FLUSH_BYTES or OUTPUT_FLUSH_SECONDS
+    after its first byte, so a chatty program costs a few frames instead of
+    one per line while a lone prompt still arrives promptly. Windows can't
+    select() on pipes; there each read is a batch, holding whatever was
+    already waiting, up to 64 KiB.
+    """
+    if os.name == 'nt':
+        while True:
+            data = os.read(fd, 65536)
+            if not data:
+                return
+            yield data
+
+    pending = bytearray()
+    deadline = None
+    while True:
+        # Block until output arrives; once some is pending, only until its deadline
+        timeout = max(0.0, deadline - time.monotonic()) if pending else None
+        ready, _, _ = select.select([fd], [], [], timeout)
+        if ready:
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            if not pending:
+                deadline = time.monotonic() + OUTPUT_FLUSH_SECONDS
+            pending += data
+            if len(pending) < OUTPUT_FLUSH_BYTES and time.monotonic() < deadline:
+                continue
+        if pending:
+            yield bytes(pending)
+            pending.clear()
+    if pending:
+        yield bytes(pending)
 
 
 def stream_process_output(proc, process_id):
     """Stream stdout/stderr to clients and clean up afterward"""
-    output_lines = []
+    output_chunks = []
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
     try:
-        for line in proc.stdout:
-            socketio.emit('output', {
+        for data in read_output_batches(proc.stdout.fileno()):
+            chunk = decoder.decode(data).replace('\r\n', '\n')
+            if not chunk:
+                continue
+            queue_update(process_id, 'output', {
                 'process_id': process_id,
-                'line': line.rstrip('\n')
+                'chunk': chunk
             })
-            output_lines.append(line)
+            output_chunks.append(chunk)
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            queue_update(process_id, 'output', {'process_id': process_id, 'chunk': tail})
+            output_chunks.append(tail)
     except Exception as e:
         socketio.emit('error', {'message': f'Output stream error: {str(e)}'})
     finally:
@@ -342,9 +724,10 @@ def stream_process_output(proc, process_id):
                 pass
 
     return_code = proc.wait()
-    output = ''.join(output_lines)
+    output = ''.join(output_chunks)
 
-    socketio.emit('process_complete', {
+    # Queued behind the process's last output so clients see it in order
+    queue_update(process_id, 'process_complete', {
         'process_id': process_id,
         'return_code': return_code,
         'output': output
@@ -352,6 +735,58 @@ def stream_process_output(proc, process_id):
 
     cleanup_process_resources(process_id)
 
+
+def feed_process_input(proc, input_queue):
+    """Write queued input to the process's stdin until None is queued
+    
+    On POSIX stdin is made non-blocking and each write waits for the pipe
+    to be writable; if the child has exited the write fails and the writer
+    stops. Windows pipes can't be polled, so there the writes just block
+    this task.
+    """
+    fd = proc.stdin.fileno()
+    if os.name != 'nt':
+        os.set_blocking(fd, False)
+    try:
+        while True:
+            data = input_queue.get()
+            if data is None:
+                break
+            if os.name == 'nt':
+                proc.stdin.write(data)
+                proc.stdin.flush()
+                continue
+            view = memoryview(data)
+            while view:
+                select.select([], [fd], [])
+                try:
+                    view = view[os.write(fd, view):]
+                except BlockingIOError:
+                    pass  # the pipe filled up again; wait for room
+    except BrokenPipeError:
+        pass  # the process exited without reading it
+    except Exception as e:
+        socketio.emit('error', {'message': f'Failed to send input: {str(e)}'})
+    finally:
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+
+# In-process analyzer for when no pool is running (e.g. on Vercel). It keeps
+# per-file state while it works, so requests take turns with it; the work is
+# CPU-bound under the GIL either way
+ANALYZER = CodeAnalyzer()
+ANALYZER_LOCK = threading.Lock()
+
+def run_analysis(file_path):
+    """Analyze a file on the server's analysis pool, or in-process without one"""
+    pool = app.config.get('ANALYSIS_POOL')
+    if pool is None:
+        with ANALYZER_LOCK:
+            return ANALYZER.analyze_file(file_path)
+    return pool.submit(analyze_in_pool, file_path).result()
+
 @app.route('/')
 def index():
     """Main dashboard page"""
@@ -365,8 +800,7 @@ def analyze_code():
         if data and 'file_path' in data:
             file_path = data.get('file_path')
             if file_path and os.path.exists(file_path):
-                analyzer = CodeAnalyzer()
-                result = analyzer.analyze_file(file_path)
+                result = run_analysis(file_path)
                 return jsonify(result)
         return jsonify({'error': 'No file provided'}), 400
     
@@ -378,11 +812,10 @@ def analyze_code():
     ensure_upload_dir()
     original_name = secure_filename(file.filename) or f"upload_{uuid.uuid4().hex}"
     file_path = UPLOAD_DIR / original_name
-    file.save(str(file_path))
+    save_upload(file, file_path)
     
     try:
-        analyzer = CodeAnalyzer()
-        result = analyzer.analyze_file(str(file_path))
+        result = run_analysis(str(file_path))
         return jsonify(result)
     finally:
         # Clean up uploaded file
@@ -455,8 +888,7 @@ def analyze_and_run():
 
     saved_path = Path(saved_path).resolve()
 
-    analyzer = CodeAnalyzer()
-    analysis_result = analyzer.analyze_file(str(saved_path))
+    analysis_result = run_analysis(str(saved_path))
 
     limits = {
         'cpu': request.form.get('cpu') or None,
@@ -494,28 +926,25 @@ def analyze_and_run():
 @app.route('/api/stop/<process_id>', methods=['POST'])
 def stop_process(process_id):
     """Stop a running process"""
-    if process_id in running_processes:
-        proc = running_processes[process_id]['process']
-        proc.terminate()
+    with PROC_LOCK:
+        info = running_processes.get(process_id)
+    if info:
+        info['process'].terminate()
         return jsonify({'success': True})
     return jsonify({'error': 'Process not found'}), 404
 
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Get status of all processes"""
-    status = []
-    for pid, info in running_processes.items():
-        try:
-            proc = info['process']
-            if proc.poll() is None:  # Still running
-                status.append({
-                    'process_id': pid,
-                    'pid': info['pid'],
-                    'command': info['command'],
-                    'running': True
-                })
-        except:
-            pass
+    # Entries are removed by stream_process_output once the process has been
+    # reaped, so everything still registered is running
+    with PROC_LOCK:
+        status = [{
+            'process_id': pid,
+            'pid': info['pid'],
+            'command': info['command'],
+            'running': True
+        } for pid, info in running_processes.items()]
     return jsonify(status)
 
 @socketio.on('send_input')
@@ -524,26 +953,24 @@ def handle_send_input(data):
     process_id = data.get('process_id')
     text = data.get('text', '')
 
-    if not process_id or process_id not in running_processes or text is None:
+    if not process_id or text is None:
         return
 
-    proc_info = running_processes.get(process_id)
-    proc = proc_info.get('process') if proc_info else None
-    stdin = proc_info.get('stdin') if proc_info else None
+    with PROC_LOCK:
+        proc_info = running_processes.get(process_id)
+    if proc_info is None:
+        return
+    proc = proc_info.get('process')
 
-    if proc is None or proc.poll() is not None or stdin is None:
+    if proc is None or proc.poll() is not None:
         return
 
     append_newline = data.get('append_newline', True)
 
-    try:
-        if append_newline and not text.endswith('\n'):
-            stdin.write(text + '\n')
-        else:
-            stdin.write(text)
-        stdin.flush()
-    except Exception as e:
-        socketio.emit('error', {'message': f'Failed to send input: {str(e)}'})
+    if append_newline and not text.endswith('\n'):
+        text += '\n'
+    # Picked up by feed_process_input; nothing here waits on the pipe
+    proc_info['input_queue'].put(text.encode('utf-8'))
 
 if __name__ == '__main__':
     # Create templates directory if it doesn't exist
@@ -561,8 +988,11 @@ if __name__ == '__main__':
         print("   http://localhost:5000")
         print("   http://127.0.0.1:5000")
         print("\n⏹️  Press Ctrl+C to stop\n")
+        app.config['ANALYSIS_POOL'] = start_analysis_pool()
         try:
-            socketio.run(app, host='127.0.0.1', port=5000, debug=False, allow_unsafe_werkzeug=True)
+            # Werkzeug is only the server in threading mode; eventlet brings its own
+            run_options = {'allow_unsafe_werkzeug': True} if ASYNC_MODE == 'threading' else {}
+            socketio.run(app, host='127.0.0.1', port=5000, debug=False, **run_options)
         except OSError as e:
             if "Address already in use" in str(e):
                 print(f"\n❌ Port 5000 is already in use")